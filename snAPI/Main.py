@@ -1,7 +1,8 @@
 # Torsten Krause, PicoQuant GmbH, 2023
 
+import configparser
+import contextlib
 import ctypes as ct
-import inspect
 import json
 import numpy as np
 import os
@@ -11,10 +12,197 @@ import traceback
 import typing
 
 from datetime import datetime, timezone
+from snAPI import _tttr_kernels
 from snAPI.Constants import *
 from snAPI.Utils import *
 
 
+# the directory of the package holds the snAPI64.dll and the default system.ini
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+_DEFAULT_SYSTEM_INI = os.path.join(_PACKAGE_DIR, 'system.ini')
+
+
+def _isLoggingEnabled(systemIni):
+    # reads the [Log] flags of the system INI, logging stays enabled if they can not be read
+    config = configparser.ConfigParser(inline_comment_prefixes=('#',), strict=False)
+    try:
+        config.read(systemIni, encoding='utf-8')
+        return config.getboolean('Log', 'File', fallback=True) or config.getboolean('Log', 'Console', fallback=True)
+    except (configparser.Error, ValueError):
+        return True
+
+
+# the rate functions of the snAPI.dll always write the rates of all possible input channels
+_MAX_CHANNELS = 64
+
+
+def _chansToMask(chans):
+    """builds the channel bit mask of the filters from a list or an array of channel indices"""
+    mask = 0
+    for c in chans:
+        mask |= 1 << int(c)
+    return mask
+
+
+# the 4 marker flags of the marker bits [0..15]
+_MARKER_LUT = np.array([[bool(m & (1 << b)) for b in range(4)] for m in range(16)], dtype=bool)
+# the table is shared by all calls, so it must not be changed through a returned row
+_MARKER_LUT.flags.writeable = False
+
+# marker records by the special bit and the channel field (data >> 25): special and channel [1..15]
+_IS_MARKER_LUT = np.zeros(128, dtype=bool)
+_IS_MARKER_LUT[0x41:0x50] = True
+
+# the Device setters and the deviceConfig keys of their parameters, used by Device.applyConfig
+# the keys are the ones of the deviceConfig reported by the API
+_DEVICE_SETTERS = (
+    ("setSyncDiv",              ("SyncDiv",)),
+    ("setSyncTrigMode",         ("SyncTrigMode",)),
+    ("setSyncEdgeTrig",         ("SyncTrigLvl", "SyncTrigEdge")),
+    ("setSyncCFD",              ("SyncDiscrLvl", "SyncZeroXLvL")),
+    ("setSyncChannelOffset",    ("SyncChannelOffset",)),
+    ("setSyncChannelEnable",    ("SyncChannelEnable",)),
+    ("setSyncDeadTime",         ("SyncDeadTime",)),
+    ("setInputHysteresis",      ("HystCode",)),
+    ("setTimingMode",           ("TimingMode",)),
+    ("setStopOverflow",         ("StopCount",)),
+    ("setBinning",              ("Binning",)),
+    ("setOffset",               ("Offset",)),
+    ("setHistoLength",          ("lengthCode",)),
+    ("setMeasControl",          ("MeasControl", "StartEdge", "StopEdge")),
+    ("setTriggerOutput",        ("TrigOutput",)),
+    ("setMarkerEdges",          ("MarkerEdges",)),
+    ("setMarkerEnable",         ("MarkerEna",)),
+    ("setMarkerHoldoffTime",    ("HoldoffTime",)),
+    ("setOflCompression",       ("HoldTime",)),
+)
+_CHANNEL_SETTERS = (
+    ("setInputTrigMode",        ("TrigMode",)),
+    ("setInputEdgeTrig",        ("TrigLvl", "TrigEdge")),
+    ("setInputCFD",             ("DiscrLvl", "ZeroXLvl")),
+    ("setInputChannelOffset",   ("ChanOffs",)),
+    ("setInputChannelEnable",   ("ChanEna",)),
+    ("setInputDeadTime",        ("DeadTime",)),
+)
+# the setters of these keys take an enum instead of the value of the deviceConfig
+_CONFIG_ENUMS = {
+    "SyncTrigMode": TrigMode.__getitem__,
+    "TrigMode":     TrigMode.__getitem__,
+    "MeasControl":  MeasControl,
+}
+
+# ctypes prototypes (argtypes, restype) of the snAPI.dll functions, see CPP/snAPI_lib.h
+_DLL_PROTOTYPES = {
+    # snAPI (setLogLevel, setPTUFilePath and setIniConfig are declared void, but their result is passed on as before)
+    "initAPI":                  ([ct.c_char_p], ct.c_bool),
+    "exitAPI":                  ([], None),
+    "setLogLevel":              ([ct.c_int, ct.c_bool], ct.c_int),
+    "logExternal":              ([ct.c_char_p], None),
+    "logError":                 ([ct.c_char_p], None),
+    "getDeviceIDs":             ([ct.c_char_p], ct.c_bool),
+    "getDevice":                ([ct.c_char_p], ct.c_bool),
+    "closeDevice":              ([ct.c_bool], None),
+    "getFileDevice":            ([ct.c_char_p], ct.c_bool),
+    "initDevice":               ([ct.c_int, ct.c_int], ct.c_bool),
+    "loadIniConfig":            ([ct.c_char_p], ct.c_bool),
+    "setPTUFilePath":           ([ct.c_char_p], ct.c_int),
+    "setIniConfig":             ([ct.c_char_p], ct.c_int),
+    "getDeviceConfig":          ([ct.c_char_p], ct.c_int),
+    "getMeasDescription":       ([ct.c_char_p], ct.c_int),
+    "stopMeasure":              ([], ct.c_bool),
+    "clearMeasure":             ([], ct.c_bool),
+    "getCountRates":            ([ct.c_void_p, ct.c_void_p], None),
+    "getSyncPeriod":            ([ct.POINTER(ct.c_double)], None),
+    "getNumAllChans":           ([], ct.c_int),
+    # Device
+    "setSyncDiv":               ([ct.c_int], ct.c_bool),
+    "setSyncTrigMode":          ([ct.c_int], ct.c_bool),
+    "setSyncEdgeTrig":          ([ct.c_int, ct.c_int], ct.c_bool),
+    "setSyncCFD":               ([ct.c_int, ct.c_int], ct.c_bool),
+    "setSyncChannelOffset":     ([ct.c_int], ct.c_bool),
+    "setSyncChannelEnable":     ([ct.c_int], ct.c_bool),
+    "setSyncDeadTime":          ([ct.c_int], ct.c_bool),
+    "setInputHysteresis":       ([ct.c_int], ct.c_bool),
+    "setTimingMode":            ([ct.c_int], ct.c_bool),
+    "setStopOverflow":          ([ct.c_uint], ct.c_bool),
+    "setBinning":               ([ct.c_int], ct.c_bool),
+    "setOffset":                ([ct.c_int], ct.c_bool),
+    "setHistoLength":           ([ct.c_int], ct.c_bool),
+    "setMeasControl":           ([ct.c_int, ct.c_int, ct.c_int], ct.c_bool),
+    "setTriggerOutput":         ([ct.c_int], ct.c_bool),
+    "setMarkerEdges":           ([ct.c_int, ct.c_int, ct.c_int, ct.c_int], ct.c_bool),
+    "setMarkerEnable":          ([ct.c_int, ct.c_int, ct.c_int, ct.c_int], ct.c_bool),
+    "setMarkerHoldoffTime":     ([ct.c_int], ct.c_bool),
+    "setOflCompression":        ([ct.c_int], ct.c_bool),
+    "setInputTrigMode":         ([ct.c_int, ct.c_int], ct.c_bool),
+    "setInputEdgeTrig":         ([ct.c_int, ct.c_int, ct.c_int], ct.c_bool),
+    "setInputCFD":              ([ct.c_int, ct.c_int, ct.c_int], ct.c_bool),
+    "setInputChannelOffset":    ([ct.c_int, ct.c_int], ct.c_bool),
+    "setInputChannelEnable":    ([ct.c_int, ct.c_int], ct.c_bool),
+    "setInputDeadTime":         ([ct.c_int, ct.c_int], ct.c_bool),
+    # Filter
+    "setRowEventFilter":        ([ct.c_int, ct.c_int, ct.c_int, ct.c_bool, ct.c_int, ct.c_int], ct.c_bool),
+    "enableRowEventFilter":     ([ct.c_int, ct.c_bool], ct.c_bool),
+    "setMainEventFilterParams": ([ct.c_int, ct.c_int, ct.c_bool], ct.c_bool),
+    "setMainEventFilterChannels": ([ct.c_int, ct.c_int, ct.c_int], ct.c_bool),
+    "enableMainEventFilter":    ([ct.c_bool], ct.c_bool),
+    "setFilterTestMode":        ([ct.c_bool], ct.c_bool),
+    "getRowFilteredRates":      ([ct.c_void_p, ct.c_void_p], ct.c_bool),
+    "getMainFilteredRates":     ([ct.c_void_p, ct.c_void_p], ct.c_bool),
+    # WhiteRabbit
+    "WRabbitGetMAC":            ([ct.c_char_p], ct.c_bool),
+    "WRabbitSetMAC":            ([ct.c_char_p], ct.c_bool),
+    "WRabbitGetInitScript":     ([ct.c_char_p], ct.c_bool),
+    "WRabbitSetInitScript":     ([ct.c_char_p], ct.c_bool),
+    "WRabbitGetSFPData":        ([ct.c_char_p, ct.c_void_p, ct.c_void_p, ct.c_void_p], ct.c_bool),
+    "WRabbitSetSFPData":        ([ct.c_char_p, ct.c_void_p, ct.c_void_p, ct.c_void_p], ct.c_bool),
+    "WRabbitSetMode":           ([ct.c_int, ct.c_int, ct.c_int], ct.c_bool),
+    "WRabbitSetTime":           ([ct.c_uint64], ct.c_bool),
+    "WRabbitGetTime":           ([ct.c_void_p, ct.c_void_p], ct.c_bool),
+    "WRabbitGetStatus":         ([ct.c_void_p], ct.c_bool),
+    "WRabbitGetTermOutput":     ([ct.c_char_p], ct.c_bool),
+    "WRabbitInitLink":          ([ct.c_int], ct.c_bool),
+    # Measurements (the buffers are passed byref, so they are declared as void pointers)
+    "getHistogram":             ([ct.c_int, ct.c_bool, ct.c_bool, ct.c_void_p, ct.c_void_p], ct.c_bool),
+    "getTimeTrace":             ([ct.c_int, ct.c_bool, ct.c_bool, ct.c_void_p, ct.c_void_p, ct.c_void_p], ct.c_bool),
+    "rawMeasure":               ([ct.c_int, ct.c_bool, ct.c_bool, ct.c_void_p, ct.c_void_p, ct.c_uint64, ct.c_void_p], ct.c_bool),
+    "rawStartBlock":            ([ct.c_int, ct.c_bool, ct.c_void_p, ct.c_uint64, ct.c_void_p], ct.c_bool),
+    "rawGetBlock":              ([ct.c_void_p, ct.c_void_p], ct.c_bool),
+    "ufMeasure":                ([ct.c_int, ct.c_bool, ct.c_bool, ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_uint64, ct.c_void_p], ct.c_bool),
+    "ufStartBlock":             ([ct.c_int, ct.c_bool, ct.c_void_p, ct.c_void_p, ct.c_uint64, ct.c_void_p], ct.c_bool),
+    "ufGetBlock":               ([ct.c_void_p, ct.c_void_p, ct.c_void_p], ct.c_bool),
+    "getTimesFromChannelUF":    ([ct.c_void_p, ct.c_void_p, ct.c_void_p, ct.c_int, ct.c_void_p], ct.c_bool),
+    "setHistoT2RefChan":        ([ct.c_uint8], None),
+    "setHistoT2BinWidth":       ([ct.c_uint64], None),
+    "setTimeTraceNumBins":      ([ct.c_int], None),
+    "setTimeTraceHistorySize":  ([ct.c_double], None),
+    # Correlation
+    "setG2Params":              ([ct.c_uint64, ct.c_uint64, ct.c_double, ct.c_double], None),
+    "setFCSParams":             ([ct.c_uint64, ct.c_uint64, ct.POINTER(ct.c_uint64), ct.c_uint64, ct.c_double, ct.c_double], None),
+    "setFFCSParams":            ([ct.c_uint64, ct.c_uint64, ct.POINTER(ct.c_uint64), ct.c_uint64, ct.c_double, ct.c_double], None),
+    "getCorrelation":           ([ct.c_int, ct.c_bool, ct.c_bool, ct.c_void_p, ct.c_void_p, ct.c_void_p], ct.c_bool),
+    # Manipulators
+    "getManisConfig":           ([ct.c_char_p], ct.c_int),
+    "clearManis":               ([], None),
+    "addMCoincidence":          ([ct.c_void_p, ct.c_int, ct.c_double, ct.c_int, ct.c_int, ct.c_bool], ct.c_int),
+    "addMMerge":                ([ct.c_void_p, ct.c_int, ct.c_bool], ct.c_int),
+    "addMDelay":                ([ct.c_int, ct.c_double, ct.c_bool], ct.c_int),
+    "addMHerald":               ([ct.c_uint8, ct.c_void_p, ct.c_int, ct.c_int, ct.c_int, ct.c_bool, ct.c_bool], ct.c_int),
+    "addMCountRate":            ([ct.c_double], ct.c_int),
+    "getMCountRates":           ([ct.c_int, ct.c_void_p], ct.c_bool),
+}
+
+
+def _loadLibrary():
+    """loads the snAPI.dll and declares the prototypes of :obj:`_DLL_PROTOTYPES` once"""
+    dll = ct.WinDLL(os.path.join(_PACKAGE_DIR, 'snAPI64.dll'))
+    for name, (argtypes, restype) in _DLL_PROTOTYPES.items():
+        func = getattr(dll, name)
+        func.argtypes = argtypes
+        func.restype = restype
+    return dll
+
+
 # main class
 class snAPI:
     """
@@ -44,7 +232,7 @@ Example
     sn = snAPI()
         
     """
-    dll = ct.WinDLL(os.path.abspath(os.path.join(os.path.dirname(__file__), '.\snAPI64.dll')))
+    dll = _loadLibrary()
     """
 the snAPI.dll
 
@@ -200,7 +388,7 @@ Example
 
     def __init__(self, systemIni: typing.Union[str, None] = None):
         if systemIni is None:
-            systemIni = "\\".join(inspect.getfile(snAPI).split("\\")[:-1])+'\\system.ini'
+            systemIni = _DEFAULT_SYSTEM_INI
         self.device = Device(self)
         """This is the object to the device configuration :class:`Device` class"""
         self.filter = Filter(self)
@@ -219,6 +407,15 @@ Example
         """This is the object to :class:`Correlation`. class"""
         self.manipulators = Manipulators(self)
         """This is the object to :class:`Manipulators`. class"""
+        self._deferConfigRefresh = False
+        self._configDirty = False
+        self._syncRate = ct.c_int(0)
+        self._countRates = (ct.c_int * _MAX_CHANNELS)()
+        # the JSON strings of the device IDs, the device config and the measurement description are written into one kept buffer
+        self._confBuf = (ct.c_char * 65535)()
+        self._devNameBuf = ct.create_string_buffer(64)
+        self._numAllChannels = None
+        self._logEnabled = True
         self.initAPI(systemIni)
 
 
@@ -260,15 +457,15 @@ Example
     230510_11:33:39.4988423 DEV MH_GetLibraryVersion: 3.1
     
         """
+        # nothing is assembled if file and console logging are switched off in the system INI
+        if not self._logEnabled or (not args and not kwargs):
+            return
         summarized_args = " ".join(map(str, args))
         summarized_kwargs = " ".join([f"{key}={value}" for key, value in kwargs.items()])
-        self.dll.logExternal.argtypes = [ct.c_char_p]
-        if summarized_args and summarized_kwargs:
-            self.dll.logExternal(f"{summarized_args} {summarized_kwargs}".encode('utf-8'))
-        elif summarized_args:
-            self.dll.logExternal(f"{summarized_args}".encode('utf-8'))
-        elif summarized_kwargs:
-            self.dll.logExternal(f"{summarized_kwargs}".encode('utf-8'))
+        # the message is joined and encoded once
+        message = " ".join(filter(None, (summarized_args, summarized_kwargs)))
+        if message:
+            self.dll.logExternal(message.encode('utf-8'))
 
 
     def logException(exception_type, exception, eTraceback):
@@ -287,8 +484,8 @@ Example
     230911_12:02:53.5351972 ERR                    ~~~~~~~~^^^^^^^^^^^^^^
 
         """
-        dll = ct.WinDLL(os.path.abspath(os.path.join(os.path.dirname(__file__), '.\snAPI64.dll')))
-        dll.logError.argtypes = [ct.c_char_p]
+        # the already loaded library with its declared prototypes
+        dll = snAPI.dll
         dll.logError(f"Uncaught python exception: {exception_type.__name__}!".encode('utf-8'))
         dll.logError(f"Text: {exception}".encode('utf-8'))
         if eTraceback:
@@ -381,6 +578,7 @@ Example
         """
         SBuf = systemIni.encode('utf-8')
         ok = self.dll.initAPI(SBuf)
+        self._logEnabled = _isLoggingEnabled(systemIni)
         self.getDeviceConfig()
         return ok
 
@@ -429,14 +627,16 @@ Example
     230405_12:11:07.8882089 INF API getDeviceIDs ["1045483","","","","","","",""]
     
         """
-        devIDs = (ct.c_char * 8192)()
-        found = self.dll.getDeviceIDs(devIDs)
-        devIDs = str(devIDs, "utf-8").replace('\x00','')
+        # the kept buffer is emptied by its first byte, in case the API writes no string
+        self._confBuf[0] = b'\x00'
+        found = self.dll.getDeviceIDs(self._confBuf)
+        # .value stops at the terminating zero, so only the string is copied
+        devIDs = self._confBuf.value
         if found:
             self.deviceIDs = json.loads(devIDs)
             return True
         else:
-            self.logPrint(devIDs)
+            self.logPrint(devIDs.decode("utf-8"))
             return False
 
 
@@ -476,20 +676,17 @@ Example
     
         """
         if not dev: # no device parameter
-            name = ""
-            SBuf = name.ljust(8, '\0').encode('utf-8')
-            if self.dll.getDevice(SBuf):
+            if self.dll.getDevice(self._deviceNameBuffer("")):
                 return self.getDeviceConfig()
             else:
                 self.logPrint(f"{Color.Red}Device not found!")
 
         elif (len(dev) == 1 and isinstance(dev[0], str)): # name of device
             name = dev[0]
-            SBuf = name.ljust(8, '\0').encode('utf-8')
             if len(self.deviceIDs) == 0:
                 self.getDeviceIDs()
 
-            if self.dll.getDevice(SBuf): 
+            if self.dll.getDevice(self._deviceNameBuffer(name)): 
                 return self.getDeviceConfig()
             else:
                 self.logPrint(Color.Red + "Device \"" +name+ "\" not found!")
@@ -501,8 +698,7 @@ Example
             if(dev[0] >= 0 and dev[0] < len(self.deviceIDs)) :
                 name = self.deviceIDs[dev[0]]
                 if(self.deviceIDs[dev[0]] != ""):
-                    SBuf = self.deviceIDs[dev[0]].encode('utf-8')
-                    if self.dll.getDevice(SBuf):
+                    if self.dll.getDevice(self._deviceNameBuffer(name)):
                         return self.getDeviceConfig()
                     else:
                         self.logPrint(f"{Color.Red}Error getting Device @ index: {dev[0]} \"{name}\"!") # should not happen
@@ -516,6 +712,13 @@ Example
         return False
     
 
+    def _deviceNameBuffer(self, name):
+        # the device ID is passed NUL padded in a kept buffer instead of a new padded bytes object per call
+        ct.memset(self._devNameBuf, 0, ct.sizeof(self._devNameBuf))
+        self._devNameBuf.value = name.encode('utf-8')
+        return self._devNameBuf
+
+
     def getFileDevice(self, path: str):
         """
 This function allows opening a PTU file with a specific path. The file will be handled
@@ -540,6 +743,10 @@ Example
     sn.getFileDevice(r"E:\Data\PicoQuant\CW_Shelved.ptu")
     
         """
+        # a missing file is reported without opening it through the API
+        if not os.path.isfile(path):
+            self.logPrint(f"{Color.Red}File not found: {path}")
+            return False
         SBuf = path.encode('utf-8')
         if ok:= self.dll.getFileDevice(SBuf):
             ok = self.getDeviceConfig()
@@ -691,7 +898,7 @@ Example
         """
         SBuf = path.encode('utf-8')
         if ok:= self.dll.loadIniConfig(SBuf):
-            ok = self.getDeviceConfig()
+            ok = self._refreshDeviceConfig()
         return ok
     
 
@@ -729,10 +936,62 @@ Example
         self.logPrint("setConfigIni")
         SBuf = text.encode('utf-8')
         if ok:= self.dll.setIniConfig(SBuf):
-            ok = self.getDeviceConfig()
+            ok = self._refreshDeviceConfig()
         return ok
 
 
+    @contextlib.contextmanager
+    def batchConfig(self):
+        """
+This context manager collects the configuration changes of :meth:`loadIniConfig`, :meth:`setIniConfig` and
+:meth:`Device.setBinning`. The :obj:`snAPI.deviceConfig` is read only once from the API at the end of the block,
+instead of after each change.
+
+Note
+----
+    Inside the block the :obj:`snAPI.deviceConfig` is not updated by the calls above.
+
+Parameters
+----------
+    None
+    
+Returns
+-------
+    None
+    
+Example
+-------
+::
+
+    # sets the trigger levels of several channels and refreshes the device config once
+    with sn.batchConfig():
+        for i in range(4):
+            sn.setIniConfig(f"[Channel_{i}]\\nEdgeTrig = -50,0")
+    
+        """
+        if self._deferConfigRefresh:
+            # nested blocks are refreshed by the outermost one
+            yield
+            return
+        self._deferConfigRefresh = True
+        self._configDirty = False
+        try:
+            yield
+        finally:
+            self._deferConfigRefresh = False
+            if self._configDirty:
+                self._configDirty = False
+                self.getDeviceConfig()
+
+
+    def _refreshDeviceConfig(self):
+        # reads the device config from the API or marks it for the end of a batchConfig block
+        if self._deferConfigRefresh:
+            self._configDirty = True
+            return True
+        return self.getDeviceConfig()
+
+
     def getDeviceConfig(self,):
         """
 This command reads the device configuration stored by the API and returns it to
@@ -762,14 +1021,21 @@ Example
     sn.getDeviceConfig()
     
         """
-        conf = (ct.c_char * 65535)()
-        ok = self.dll.getDeviceConfig(conf)
-        conf = str(conf, "utf-8").replace('\x00','')
+        self._confBuf[0] = b'\x00'
+        ok = self.dll.getDeviceConfig(self._confBuf)
+        conf = self._confBuf.value
         if ok:
+            # json parses the utf-8 bytes directly
             self.deviceConfig = json.loads(conf)
+            self.filter._refresh()
+            self.unfold._refresh()
+            self.raw._refresh()
+            # a new device configuration may have reset the correlation parameters of the API
+            self.correlation._lastParams = None
+            self._numAllChannels = None
             return True
         else:
-            self.logPrint(conf)
+            self.logPrint(conf.decode("utf-8"))
             return False
 
 
@@ -811,14 +1077,14 @@ Example
     }
 
         """
-        conf = (ct.c_char * 65535)()
-        ok = self.dll.getMeasDescription(conf)
-        conf = str(conf, "utf-8").replace('\x00','')
+        self._confBuf[0] = b'\x00'
+        ok = self.dll.getMeasDescription(self._confBuf)
+        conf = self._confBuf.value
         if ok:
             self.measDescription = json.loads(conf)
             return True
         else:
-            self.parent.logPrint(conf)
+            self.logPrint(conf.decode("utf-8"))
             return False
 
     def _stopMeasure(self):
@@ -863,9 +1129,11 @@ Returns
     
         """
         self.dll.clearMeasure()
+        # the API may have reset the correlation parameters, so the next setter call is not skipped
+        self.correlation._lastParams = None
 
 
-    def getCountRates(self,):
+    def getCountRates(self, out: typing.Optional[np.ndarray] = None):
         """
 This function retrieves the count rates. This measurement is first performed by the hardware by counting with a
 gate time of 100ms. You will therefore obtain new values only after this time has elapsed.
@@ -874,7 +1142,10 @@ by the count rates of the channels.
 
 Parameters
 ----------
-    None
+    out: NDArray[int32]
+        | optional buffer for the count rates with at least NumChans + 1 elements (default: None)
+        | a buffer can be reused for fast polling to avoid a new array per call
+        | raises a ValueError if it is not a contiguous int32 array of at least NumChans + 1 elements
     
 Returns
 -------
@@ -888,13 +1159,23 @@ Example
     syncrate = cntRs[0]
     chan1rate = cntRs[1]
     
+    # polling into one buffer
+    rates = np.empty(sn.deviceConfig["NumChans"] + 1, dtype=np.int32)
+    while True:
+        sn.getCountRates(rates)
+    
         """
-        syncRate =  ct.pointer(ct.c_int(0))
-        countRates = ct.ARRAY(ct.c_int, 64)()
-        ok = self.dll.getCountRates(syncRate, countRates)
-        a = np.array(countRates)
-        a = np.resize(a, self.deviceConfig["NumChans"])
-        a = np.insert(a, 0, syncRate.contents.value)
+        numChans = self.deviceConfig["NumChans"]
+        if out is None:
+            a = np.empty(numChans + 1, dtype=np.int32)
+        elif out.dtype != np.int32 or not out.flags.c_contiguous or out.size < numChans + 1:
+            raise ValueError(f"the buffer for the count rates has to be a contiguous int32 array of at least {numChans + 1} elements")
+        else:
+            a = out
+        # the rates are written to the kept buffers and copied once into the returned array
+        self.dll.getCountRates(ct.byref(self._syncRate), self._countRates)
+        a[0] = self._syncRate.value
+        ct.memmove(a[1:].ctypes.data, self._countRates, numChans * ct.sizeof(ct.c_int))
         return a
     
     
@@ -920,7 +1201,6 @@ Example
     
         """
         syncPeriod =  ct.c_double(0)
-        self.dll.getSyncPeriod.argtypes = [ct.POINTER(ct.c_double)]
         ok = self.dll.getSyncPeriod(ct.pointer(syncPeriod))
         return syncPeriod.value
 
@@ -946,7 +1226,10 @@ Example
     numChans = sn.getNumAllChannels();
     
         """
-        return self.dll.getNumAllChans()
+        # the number is cached until the device config or the manipulators change
+        if self._numAllChannels is None:
+            self._numAllChannels = self.dll.getNumAllChans()
+        return self._numAllChannels
 
 
 
@@ -990,9 +1273,7 @@ Example
     sn.device.setSyncDiv(1)
     
         """
-        if ok:= self.parent.dll.setSyncDiv(syncDiv):
-            self.parent.deviceConfig["SyncDiv"] = syncDiv
-        return ok
+        return self._apply(self.parent.dll.setSyncDiv, (syncDiv,), {"SyncDiv": syncDiv})
 
 
     def setSyncTrigMode(self, syncTrigMode: typing.Optional[TrigMode] = TrigMode.Edge):
@@ -1021,12 +1302,7 @@ Example
     sn.device.setSyncTrigMode(TriggerMode.Edge)
     
         """
-        if ok:= self.parent.dll.setSyncTrigMode(syncTrigMode.value):
-            if syncTrigMode == TrigMode.Edge:
-                self.parent.deviceConfig["SyncTrigMode"] = "Edge"
-            elif syncTrigMode == TrigMode.CFD:
-                self.parent.deviceConfig["SyncTrigMode"] = "CFD"
-        return ok
+        return self._apply(self.parent.dll.setSyncTrigMode, (syncTrigMode.value,), {"SyncTrigMode": syncTrigMode.name})
 
 
     def setSyncEdgeTrig(self, syncTrigLvl: typing.Optional[int] = -50, syncTrigEdge: typing.Optional[int] = 1):
@@ -1063,10 +1339,7 @@ Example
     sn.device.setSyncEdgeTrig(-50,1)
     
         """
-        if ok:= self.parent.dll.setSyncEdgeTrig(syncTrigLvl, syncTrigEdge):
-            self.parent.deviceConfig["SyncTrigLvl"] = syncTrigLvl
-            self.parent.deviceConfig["SyncTrigEdge"] = syncTrigEdge
-        return ok
+        return self._apply(self.parent.dll.setSyncEdgeTrig, (syncTrigLvl, syncTrigEdge), {"SyncTrigLvl": syncTrigLvl, "SyncTrigEdge": syncTrigEdge})
 
 
     def setSyncCFD(self, syncDiscrLvl: typing.Optional[int] = 50, syncZeroXLvL: typing.Optional[int] = 20):
@@ -1102,12 +1375,9 @@ Example
     sn.device.setSyncCFD(100, 30)
     
         """
-        if ok:= self.parent.dll.setSyncCFD(syncDiscrLvl, syncZeroXLvL):
-            self.parent.deviceConfig["SyncZeroXLvL"] = syncZeroXLvL
-            self.parent.deviceConfig["SyncDiscrLvl"] = syncDiscrLvl
-        return ok
-    
-    
+        return self._apply(self.parent.dll.setSyncCFD, (syncDiscrLvl, syncZeroXLvL), {"SyncZeroXLvL": syncZeroXLvL, "SyncDiscrLvl": syncDiscrLvl})
+
+
     def setSyncChannelOffset(self, syncChannelOffset: typing.Optional[int] = 0):
         """
     Supported devices: [MH150/160 | HH400 | TH260 | PH330]
@@ -1135,9 +1405,7 @@ Example
     sn.device.setSyncChannelOffset(10)
     
         """
-        if ok := self.parent.dll.setSyncChannelOffset(syncChannelOffset):
-            self.parent.deviceConfig["SyncChannelOffset"] = syncChannelOffset
-        return ok
+        return self._apply(self.parent.dll.setSyncChannelOffset, (syncChannelOffset,), {"SyncChannelOffset": syncChannelOffset})
 
 
     def setSyncChannelEnable(self, syncChannelEnable: typing.Optional[int] = 1):
@@ -1167,9 +1435,7 @@ Example
     sn.device.setSyncChannelEnable(1)
     
         """
-        if ok:= self.parent.dll.setSyncChannelEnable(syncChannelEnable):
-            self.parent.deviceConfig["SyncChannelEnable"] = syncChannelEnable
-        return ok
+        return self._apply(self.parent.dll.setSyncChannelEnable, (syncChannelEnable,), {"SyncChannelEnable": syncChannelEnable})
 
 
     def setSyncDeadTime(self, syncDeadTime: typing.Optional[int] = 800):
@@ -1207,10 +1473,8 @@ Example
     sn.device.setSyncDeadTime(1000)
     
         """
-        if ok := self.parent.dll.setSyncDeadTime(syncDeadTime):
-            self.parent.deviceConfig["SyncDeadTime"] = syncDeadTime
-        return ok
-    
+        return self._apply(self.parent.dll.setSyncDeadTime, (syncDeadTime,), {"SyncDeadTime": syncDeadTime})
+
 
     def setInputHysteresis(self, hystCode: typing.Optional[int] = 0):
         """
@@ -1242,9 +1506,7 @@ Example
     sn.device.setInputHysteresis(0)
     
         """
-        if ok := self.parent.dll.setInputHysteresis(hystCode):
-            self.parent.deviceConfig["HystCode"] = hystCode
-        return ok
+        return self._apply(self.parent.dll.setInputHysteresis, (hystCode,), {"HystCode": hystCode})
 
 
     def setTimingMode(self, timingMode: typing.Optional[int] = 0):
@@ -1276,9 +1538,7 @@ Example
     sn.device.setInputHysteresis(0)
     
         """
-        if ok := self.parent.dll.setTimingMode(timingMode):
-            self.parent.deviceConfig["TimingMode"] = timingMode
-        return ok
+        return self._apply(self.parent.dll.setTimingMode, (timingMode,), {"TimingMode": timingMode})
 
 
     def setStopOverflow(self, stopCount: typing.Optional[int] = 4294967295):
@@ -1311,9 +1571,7 @@ Example
     sn.device.setStopOverflow(1000000000)
     
         """
-        if ok := self.parent.dll.setStopOverflow(stopCount):
-            self.parent.deviceConfig["StopCount"] = stopCount
-        return ok
+        return self._apply(self.parent.dll.setStopOverflow, (stopCount,), {"StopCount": stopCount})
 
 
     def setBinning(self, binning: typing.Optional[int] = 0):
@@ -1348,7 +1606,7 @@ Example
     
         """
         if ok := self.parent.dll.setBinning(binning):
-            self.parent.getDeviceConfig()
+            self.parent._refreshDeviceConfig()
         return ok
     
 
@@ -1383,9 +1641,7 @@ Example
     sn.device.setOffset(0)
     
         """
-        if ok:= self.parent.dll.setOffset(offset):
-            self.parent.deviceConfig["Offset"] = offset
-        return ok
+        return self._apply(self.parent.dll.setOffset, (offset,), {"Offset": offset})
 
 
     def setHistoLength(self, lengthCode: typing.Optional[int] = 6):
@@ -1416,10 +1672,7 @@ Example
     sn.device.setHistoLength(10000)
     
         """
-        if ok:= self.parent.dll.setHistoLength(lengthCode):
-            self.parent.deviceConfig["NumBins"] = pow(2, 10 + lengthCode)
-            self.parent.deviceConfig["LengthCode"] = lengthCode
-        return ok
+        return self._apply(self.parent.dll.setHistoLength, (lengthCode,), {"lengthCode": lengthCode, "NumBins": pow(2, 10 + lengthCode)})
 
 
     def setMeasControl(self, measControl: typing.Optional[MeasControl] = MeasControl.SingleShotCTC, startEdge: typing.Optional[int] = 0, stopEdge: typing.Optional[int] = 0):
@@ -1453,11 +1706,7 @@ Example
     sn.device.setMeasControl(MeasControl.SingleShotCTC, 0, 0)
     
         """
-        if ok:= self.parent.dll.setMeasControl(measControl.value, startEdge, stopEdge):
-            self.parent.deviceConfig["MeasControl"] = measControl
-            self.parent.deviceConfig["StartEdge"] = startEdge
-            self.parent.deviceConfig["StopEdge"] = stopEdge
-        return ok
+        return self._apply(self.parent.dll.setMeasControl, (measControl.value, startEdge, stopEdge), {"MeasControl": measControl.value, "StartEdge": startEdge, "StopEdge": stopEdge})
 
 
     def setTriggerOutput(self, trigOutput: typing.Optional[int] = 0):
@@ -1489,10 +1738,8 @@ Example
     sn.device.setTriggerOutput(10)
     
         """
-        if ok:= self.parent.dll.setTriggerOutput(trigOutput):
-            self.parent.deviceConfig["TriggerOutput"] = trigOutput
-        return ok
-    
+        return self._apply(self.parent.dll.setTriggerOutput, (trigOutput,), {"TrigOutput": trigOutput})
+
 
     def setMarkerEdges(self, edge1: typing.Optional[int] = 0, edge2: typing.Optional[int] = 0, edge3: typing.Optional[int] = 0, edge4: typing.Optional[int] = 0):
         """
@@ -1526,10 +1773,8 @@ Example
     sn.device.setMarkerEdges(1,0,0,0)
     
         """
-        if ok:= self.parent.dll.setMarkerEdges(edge1, edge2, edge3, edge4):
-            self.parent.deviceConfig["MarkerEdges"] = [edge1, edge2, edge3, edge4]
-        return ok
-    
+        return self._apply(self.parent.dll.setMarkerEdges, (edge1, edge2, edge3, edge4), {"MarkerEdges": [edge1, edge2, edge3, edge4]})
+
 
     def setMarkerEnable(self, ena1: typing.Optional[int] = 0, ena2: typing.Optional[int] = 0, ena3: typing.Optional[int] = 0, ena4: typing.Optional[int] = 0):
         """
@@ -1563,10 +1808,8 @@ Example
     sn.device.setMarkerEnable(1,0,0,0)
     
         """
-        if ok:= self.parent.dll.setMarkerEnable(ena1, ena2, ena3, ena4):
-            self.parent.deviceConfig["MarkerEna"] = [ena1, ena2, ena3, ena4]
-        return ok
-    
+        return self._apply(self.parent.dll.setMarkerEnable, (ena1, ena2, ena3, ena4), {"MarkerEna": [ena1, ena2, ena3, ena4]})
+
 
     def setMarkerHoldoffTime(self, holdofftime: typing.Optional[int] = 0):
         """
@@ -1601,10 +1844,8 @@ Example
     sn.device.setMarkerHoldoffTime(100)
     
         """
-        if ok:= self.parent.dll.setMarkerHoldoffTime(holdofftime):
-            self.parent.deviceConfig["Holdofftime"] = holdofftime
-        return ok
-    
+        return self._apply(self.parent.dll.setMarkerHoldoffTime, (holdofftime,), {"HoldoffTime": holdofftime})
+
 
     def setOflCompression(self, holdtime: typing.Optional[int] = 2):
         """
@@ -1642,9 +1883,7 @@ Example
     sn.device.setOflCompression(10)
     
         """
-        if ok:= self.parent.dll.setOflCompression(holdtime):
-            self.parent.deviceConfig["Holdtime"] = holdtime
-        return ok
+        return self._apply(self.parent.dll.setOflCompression, (holdtime,), {"HoldTime": holdtime})
 
 
     def setInputTrigMode(self, channel: typing.Optional[int] = -1, trigMode: typing.Optional[TrigMode] = TrigMode.Edge):
@@ -1680,20 +1919,7 @@ Example
     sn.device.setInputTrigMode(0, TriggerMode.Edge)
     
         """
-        if ok:= self.parent.dll.setInputTrigMode(channel, trigMode.value):
-            trigModeS = ""
-            if trigMode == TrigMode.CFD:
-                trigModeS = "CFD"
-            elif trigMode == TrigMode.Edge:
-                trigModeS = "Edge"
-                
-            if channel == -1:
-                for chan in range(self.parent.deviceConfig["NumChans"]):
-                    self.parent.deviceConfig["ChansCfg"][chan]["TrigMode"] = trigModeS
-            else:
-                self.parent.deviceConfig["ChansCfg"][channel]["TrigMode"] = trigModeS
-                
-        return ok
+        return self._applyChan(self.parent.dll.setInputTrigMode, channel, (trigMode.value,), {"TrigMode": trigMode.name})
 
 
     def setInputEdgeTrig(self, channel: typing.Optional[int] = -1, trigLvl: typing.Optional[int] = -50, trigEdge: typing.Optional[int] = 1):
@@ -1733,16 +1959,7 @@ Example
     sn.device.setInputEdgeTrig(0, -100, 0)
     
         """
-        if ok:= self.parent.dll.setInputEdgeTrig(channel, trigLvl, trigEdge):
-            if channel == -1:
-                for chan in range(self.parent.deviceConfig["NumChans"]):
-                    self.parent.deviceConfig["ChansCfg"][chan]["TrigLvl"] = trigLvl
-                    self.parent.deviceConfig["ChansCfg"][chan]["TrigEdge"] = trigEdge
-            else:
-                self.parent.deviceConfig["ChansCfg"][channel]["TrigLvl"] = trigLvl
-                self.parent.deviceConfig["ChansCfg"][channel]["TrigEdge"] = trigEdge
-                
-        return ok
+        return self._applyChan(self.parent.dll.setInputEdgeTrig, channel, (trigLvl, trigEdge), {"TrigLvl": trigLvl, "TrigEdge": trigEdge})
 
 
     def setInputCFD(self, channel: typing.Optional[int] = -1, discrLvl: typing.Optional[int] = 50, zeroXLvl: typing.Optional[int] = 20):
@@ -1779,17 +1996,8 @@ Example
     sn.device.setInputEdgeTrig(0, 100, 30)
     
         """
-        if ok:= self.parent.dll.setInputCFD(channel, discrLvl, zeroXLvl):
-            if channel == -1:
-                for chan in range(self.parent.deviceConfig["NumChans"]):
-                    self.parent.deviceConfig["ChansCfg"][chan]["DiscrLvl"] = discrLvl
-                    self.parent.deviceConfig["ChansCfg"][chan]["ZeroXLvl"] = zeroXLvl
-            else:
-                self.parent.deviceConfig["ChansCfg"][channel]["DiscrLvl"] = discrLvl
-                self.parent.deviceConfig["ChansCfg"][channel]["ZeroXLvl"] = zeroXLvl
-                
-        return ok
-    
+        return self._applyChan(self.parent.dll.setInputCFD, channel, (discrLvl, zeroXLvl), {"DiscrLvl": discrLvl, "ZeroXLvl": zeroXLvl})
+
 
     def setInputChannelOffset(self, channel: typing.Optional[int] = -1, chanOffs: typing.Optional[int] = 0):
         """
@@ -1824,13 +2032,7 @@ Example
     sn.device.setInputChannelOffset(0, 100)
     
         """
-        if ok:= self.parent.dll.setInputChannelOffset(channel, chanOffs):
-            if channel == -1:
-                for chan in range(self.parent.deviceConfig["NumChans"]):
-                    self.parent.deviceConfig["ChansCfg"][chan]["ChanOffs"] = chanOffs
-            else:
-                self.parent.deviceConfig["ChansCfg"][channel]["ChanOffs"] = chanOffs
-        return ok
+        return self._applyChan(self.parent.dll.setInputChannelOffset, channel, (chanOffs,), {"ChanOffs": chanOffs})
 
 
     def setInputChannelEnable(self, channel: typing.Optional[int] = -1, chanEna: typing.Optional[int] = 1):
@@ -1866,13 +2068,7 @@ Example
     sn.device.setInputEdgeTrig(3, 0)
     
         """
-        if ok:= self.parent.dll.setInputChannelEnable(channel, chanEna):
-            if channel == -1:
-                for chan in range(self.parent.deviceConfig["NumChans"]):
-                    self.parent.deviceConfig["ChansCfg"][chan]["ChanEna"] = chanEna
-            else:
-                self.parent.deviceConfig["ChansCfg"][channel]["ChanEna"] = chanEna
-        return ok
+        return self._applyChan(self.parent.dll.setInputChannelEnable, channel, (chanEna,), {"ChanEna": chanEna})
 
 
     def setInputDeadTime(self, channel: typing.Optional[int] = -1, deadTime: typing.Optional[int] = 800):
@@ -1912,15 +2108,233 @@ Example
     sn.device.setInputDeadTime(1000)
     
         """
-        if ok:= self.parent.dll.setInputDeadTime(channel, deadTime):
-            if channel == -1:
-                for chan in range(self.parent.deviceConfig["NumChans"]):
-                    self.parent.deviceConfig["ChansCfg"][chan]["DeadTime"] = deadTime
-            else:
-                self.parent.deviceConfig["ChansCfg"][channel]["DeadTime"] = deadTime
+        return self._applyChan(self.parent.dll.setInputDeadTime, channel, (deadTime,), {"DeadTime": deadTime})
+
+
+    def _apply(self, fn, args, updates):
+        # calls the API only if a value changes and mirrors the values into the deviceConfig on success
+        if self._unchanged(**updates):
+            return True
+        if ok:= fn(*args):
+            self.parent.deviceConfig.update(updates)
+        return ok
+
+
+    def _applyChan(self, fn, channel, args, values):
+        # the same for the channel setters, channel -1 means all channels
+        if self._chanCfgUnchanged(channel, **values):
+            return True
+        if ok:= fn(channel, *args):
+            self._setChanCfg(channel, **values)
+        return ok
+
+
+    def _cacheValid(self):
+        # inside snAPI.batchConfig the deviceConfig is not refreshed, so it may not hold the values of the API
+        return not self.parent._deferConfigRefresh and not self.parent._configDirty
+
+
+    def _validChannel(self, channel):
+        # channel -1 means all channels, invalid channels are left to the API to report
+        config = self.parent.deviceConfig
+        return "ChansCfg" in config and (channel == -1 or 0 <= channel < config["NumChans"])
+
+
+    def _unchanged(self, **values):
+        # True if the deviceConfig already holds all values, then the call into the API is skipped
+        if not self._cacheValid():
+            return False
+        config = self.parent.deviceConfig
+        return all(key in config and config[key] == value for key, value in values.items())
+
+
+    def _chanCfgUnchanged(self, channel, **values):
+        # the same check for the channel settings, channel -1 means all channels
+        if not self._cacheValid() or not self._validChannel(channel):
+            return False
+        config = self.parent.deviceConfig
+        chansCfg = config["ChansCfg"][:config["NumChans"]] if channel == -1 else [config["ChansCfg"][channel]]
+        return all(key in chanCfg and chanCfg[key] == value for chanCfg in chansCfg for key, value in values.items())
+
+
+    def invalidateCache(self):
+        """
+The setters of the :class:`Device` class skip the call into the API if the :obj:`snAPI.deviceConfig` already
+holds the value. This function reads the device configuration from the API again, so that the following
+setter calls compare against the actual state, e.g. after the configuration was changed from outside of this
+snAPI object.
+    
+Parameters
+----------
+    None
+    
+Returns
+-------
+    True:  operation successful
+    False: operation failed
+    
+Example
+-------
+::
+    
+    sn.device.invalidateCache()
+    sn.device.setSyncDiv(1)
+    
+        """
+        return self.parent.getDeviceConfig()
+
+
+    def _setChanCfg(self, channel, **values):
+        # mirrors the values of a channel setter into the deviceConfig, channel -1 means all channels
+        if not self._validChannel(channel):
+            return
+        config = self.parent.deviceConfig
+        if channel == -1:
+            for chanCfg in config["ChansCfg"][:config["NumChans"]]:
+                chanCfg.update(values)
+        else:
+            config["ChansCfg"][channel].update(values)
+
+
+    def applyConfig(self, config: dict, dryRun: typing.Optional[bool] = False):
+        """
+    Supported devices: [MH150/160 | HH400 | PH330 | TH260]
+    
+This function applies many settings of a dict with the keys of the :obj:`snAPI.deviceConfig`, e.g. a copy of a
+previously stored deviceConfig. It compares the settings with the :obj:`snAPI.deviceConfig` and calls only the setters
+of the values that differ. If a setter takes more than one parameter (e.g. `SyncTrigLvl` and `SyncTrigEdge`), the
+missing ones are taken from the :obj:`snAPI.deviceConfig`. The channel settings are given in `ChansCfg` as a dict of
+the channel index (-1 for all channels) or as a list in the order of the channels. Keys that can not be set, like
+`Model` or `NumChans`, are listed in the log.
+    
+Parameters
+----------
+    config: dict
+        | settings with the keys of the deviceConfig
+    dryRun: bool (default: False)
+        | True: no setter is called, the list of the needed calls is returned
+    
+Returns
+-------
+    True:  operation successful
+    False: operation failed
+    list:  the setter names and their parameters (dryRun)
+    
+Example
+-------
+::
+    
+    config = {
+        "SyncDiv": 1,
+        "SyncTrigLvl": -70,
+        "TrigOutput": 0,
+        "MarkerEdges": [1, 0, 0, 0],
+        "ChansCfg": {-1: {"TrigLvl": -100}, 1: {"ChanOffs": 2000}}}
+    
+    # prints the calls that are needed
+    sn.logPrint(sn.device.applyConfig(config, dryRun = True))
+    sn.device.applyConfig(config)
+    
+        """
+        current = self.parent.deviceConfig
+        calls = []
+        used = {"ChansCfg"}
+        for setter, keys in _DEVICE_SETTERS:
+            if any(key in config for key in keys):
+                used.update(keys)
+                # missing parameters of a setter are taken from the deviceConfig
+                values = {key: config.get(key, current.get(key)) for key in keys}
+                if not self._unchanged(**values):
+                    calls.append((setter, self._setterArgs(values)))
+        ignored = [key for key in config if key not in used]
+        
+        chansCfg = config.get("ChansCfg", {})
+        for channel, chanConfig in (chansCfg.items() if isinstance(chansCfg, dict) else enumerate(chansCfg)):
+            currentChan = current["ChansCfg"][max(channel, 0)] if self._validChannel(channel) else {}
+            usedChan = {"Index"}
+            for setter, keys in _CHANNEL_SETTERS:
+                if any(key in chanConfig for key in keys):
+                    usedChan.update(keys)
+                    values = {key: chanConfig.get(key, currentChan.get(key)) for key in keys}
+                    if not self._chanCfgUnchanged(channel, **values):
+                        calls.append((setter, (channel,) + self._setterArgs(values)))
+            ignored += [f"ChansCfg[{channel}].{key}" for key in chanConfig if key not in usedChan]
+        
+        if ignored:
+            self.parent.logPrint(f"applyConfig ignores the keys that can not be set: {', '.join(ignored)}")
+        if dryRun:
+            return calls
+        ok = True
+        # setBinning reads the whole deviceConfig, in the batch this is done only once at the end
+        with self.parent.batchConfig():
+            for setter, args in calls:
+                if None in args:
+                    self.parent.logPrint(f"{Color.Red}Missing parameter for {setter}: {args}")
+                    ok = False
+                else:
+                    ok &= getattr(self, setter)(*args)
         return ok
 
 
+    @staticmethod
+    def _setterArgs(values):
+        # lists like the marker edges are passed as single arguments, enums are built from the deviceConfig values
+        args = []
+        for key, value in values.items():
+            if isinstance(value, (list, tuple)):
+                args.extend(value)
+            elif value is not None and key in _CONFIG_ENUMS:
+                args.append(_CONFIG_ENUMS[key](value))
+            else:
+                args.append(value)
+        return tuple(args)
+
+
+    def batchUpdate(self, **sections):
+        """
+    Supported devices: [MH150/160 | HH400 | PH330 | TH260]
+    
+This function sets many configuration parameters at once. The parameters are composed into one INI string
+which is passed to :meth:`snAPI.setIniConfig`. So there is only one call into the API and the :obj:`snAPI.deviceConfig`
+is read only once, instead of once per setter. The names of the sections and the parameters are the ones of
+the INI file, see :ref:`configuration`.
+    
+Parameters
+----------
+    sections: dict
+        | the section name as keyword (Device, All_Channels, Channel_0, ...) and a dict of the parameters
+        | multiple values of a parameter can be given as a tuple or list
+    
+Returns
+-------
+    True:  operation successful
+    False: operation failed
+    
+Example
+-------
+::
+    
+    # sets the sync divider, the binning and the trigger levels of two channels in one call
+    sn.device.batchUpdate(
+        Device = {"SyncDiv": 1, "Binning": 1},
+        Channel_0 = {"EdgeTrig": (-50, 1)},
+        Channel_1 = {"EdgeTrig": (-120, 1), "ChanOffs": 0})
+    
+        """
+        lines = []
+        for section, values in sections.items():
+            lines.append(f"[{section}]")
+            for key, value in values.items():
+                # multiple values like the level and the edge of a trigger are separated by commas
+                if isinstance(value, (list, tuple)):
+                    value = ",".join(map(str, value))
+                lines.append(f"{key} = {value}")
+        if not lines:
+            return True
+        # all changes are sent in one INI string, so the device config is read only once
+        return self.parent.setIniConfig("\n".join(lines))
+
+
 
 class Filter():
     """
@@ -1961,6 +2375,15 @@ Note
 
     def __init__(self, parent):
         self.parent = parent    
+        self._numChans = 0
+        self._syncRate = ct.c_int(0)
+        self._syncRate_p = ct.pointer(self._syncRate)
+        self._countRates = (ct.c_int * _MAX_CHANNELS)()
+
+
+    def _refresh(self):
+        # caches the number of channels of the deviceConfig, called by snAPI.getDeviceConfig
+        self._numChans = int(self.parent.deviceConfig["NumChans"])
 
 
     def setRowParams(self, row: int, timeRange: int, matchCount: int, inverse: bool, useChans:typing.List[int], passChans:typing.List[int]):
@@ -2016,16 +2439,9 @@ Example
     sn.filter.setRowParams(0, 1000, 1, False, [0,1], [])
     
         """
-        
-        uc = 0
-        for i in useChans:
-            uc |= pow(2, i)
-            
-        pc = 0
-        for i in passChans:
-            pc |= pow(2, i)
+        uc = _chansToMask(useChans)
+        pc = _chansToMask(passChans)
 
-        self.parent.dll.setRowEventFilter.restype = ct.c_bool
         return self.parent.dll.setRowEventFilter(row, timeRange, matchCount, inverse, uc, pc)
 
 
@@ -2057,7 +2473,6 @@ Example
     sn.filter.enableRow(0, True)
     
         """
-        self.parent.dll.enableRowEventFilter.restype = ct.c_bool
         return self.parent.dll.enableRowEventFilter(row, enable)
 
 
@@ -2105,7 +2520,6 @@ Example
     sn.filter.setMainParams(0, 1000, 1, False
     
         """
-        self.parent.dll.setMainEventFilterParams.restype = ct.c_bool
         return self.parent.dll.setMainEventFilterParams(timeRange, matchCount, inverse)
 
 
@@ -2153,15 +2567,9 @@ Example
     sn.filter.setRowParams(0, [0,1], [8])
     
         """
-        uc = 0
-        for i in useChans:
-            uc |= pow(2, i)
-            
-        pc = 0
-        for i in passChans:
-            pc |= pow(2, i)
+        uc = _chansToMask(useChans)
+        pc = _chansToMask(passChans)
         
-        self.parent.dll.setMainEventFilterChannels.restype = ct.c_bool
         return self.parent.dll.setMainEventFilterChannels(row, uc, pc)
 
 
@@ -2198,7 +2606,6 @@ Example
     sn.filter.enableMain(True)
     
         """
-        self.parent.dll.enableMainEventFilter.restype = ct.c_bool
         return self.parent.dll.enableMainEventFilter(enable)
         #     self.parent.deviceConfig["SyncDiv"] = syncDiv
         # return ok
@@ -2235,7 +2642,6 @@ Example
     sn.filter.setTestMode(True)
     
         """
-        self.parent.dll.setFilterTestMode.restype = ct.c_bool
         return self.parent.dll.setFilterTestMode(testMode)
         #     self.parent.deviceConfig["SyncDiv"] = syncDiv
         # return ok
@@ -2270,12 +2676,10 @@ Example
     chan1rate = cntRs[1]
     
         """
-        syncRate =  ct.pointer(ct.c_int(0))
-        countRates = ct.ARRAY(ct.c_int, 64)()
-        if ok:=  self.parent.dll.getRowFilteredRates(syncRate, countRates):
-            a = np.array(countRates)
-            a = np.resize(a, self.parent.deviceConfig["NumChans"])
-            a = np.insert(a, 0, syncRate.contents.value)
+        if ok:=  self.parent.dll.getRowFilteredRates(self._syncRate_p, self._countRates):
+            a = np.empty(self._numChans + 1, dtype=np.int32)
+            a[0] = self._syncRate.value
+            ct.memmove(a[1:].ctypes.data, self._countRates, self._numChans * ct.sizeof(ct.c_int))
             return a
         
         else:
@@ -2307,12 +2711,10 @@ Example
     chan1rate = cntRs[1]
     
         """
-        syncRate =  ct.pointer(ct.c_int(0))
-        countRates = ct.ARRAY(ct.c_int, 64)()
-        if ok:= self.parent.dll.getMainFilteredRates(syncRate, countRates):
-            a = np.array(countRates)
-            a = np.resize(a, self.parent.deviceConfig["NumChans"])
-            a = np.insert(a, 0, syncRate.contents.value)
+        if ok:= self.parent.dll.getMainFilteredRates(self._syncRate_p, self._countRates):
+            a = np.empty(self._numChans + 1, dtype=np.int32)
+            a[0] = self._syncRate.value
+            ct.memmove(a[1:].ctypes.data, self._countRates, self._numChans * ct.sizeof(ct.c_int))
             return a
         
         else:
@@ -2443,7 +2845,6 @@ Example
         try:
             self.SFPnames = list(filter(None,str(names, "utf-8").replace('\x00','\n').splitlines()))
         except UnicodeDecodeError as e:
-            self.parent.dll.logError.argtypes = [ct.c_char_p]
             self.parent.dll.logError(f"Invalid response @ getSFPData: '{e.reason}'".encode('utf-8'))
         self.SFPdTxs = np.array(dTxs)
         self.SFPdRxs = np.array(dRxs)
@@ -2553,7 +2954,6 @@ Example
     sn.whiteRabbit.SetMode(reinitWithMode= True, mode = WRmode.Master)
         """
         script = (ct.c_char * 256)()
-        self.parent.dll.WRabbitSetMode.restype = ct.c_bool
         return self.parent.dll.WRabbitSetMode(bootFromScript, reinitWithMode, mode.value)
     
     def getTime(self,):
@@ -2610,7 +3010,6 @@ Example
     
         """
         t = ct.c_uint64(round(time.replace(tzinfo=timezone.utc).timestamp()))
-        self.parent.dll.WRabbitSetTime.restype = ct.c_bool
         return self.parent.dll.WRabbitSetTime(t)
     
     def initLink(self, onOff: bool):
@@ -2638,7 +3037,6 @@ Example
     # switches the WR link on
     sn.whiteRabbit.initLink(True)
         """
-        self.parent.dll.WRabbitInitLink.restype = ct.c_bool
         return self.parent.dll.WRabbitInitLink(onOff)
     
     def getStatus(self,):
@@ -2786,6 +3184,9 @@ There are special functions to decode the :obj:`.MeasMode.T2`and :obj:`.MeasMode
     - :meth:`isMarker`
     - :meth:`markers`
 
+The functions :meth:`isSpecials`, :meth:`timeTags_T2`, :meth:`nSyncs_T3`, :meth:`dTimes_T3`, :meth:`channels` and
+:meth:`isMarkers` decode whole arrays of data records at once. Use them instead of looping over the records.
+
 .. seealso ::
     | To fully understand the TTTR format please read the MultiHarp manual and/or
     | :fa:`file-pdf` `Time Tagged Time-Resolved Fluorescence Data Collection in Life Sciences <https://www.picoquant.com/images/uploads/page/files/14528/technote_tttr.pdf>`_
@@ -2795,9 +3196,33 @@ There are special functions to decode the :obj:`.MeasMode.T2`and :obj:`.MeasMode
 
     def __init__(self, parent):
         self.parent = parent
-        self.data = ct.ARRAY(ct.c_uint32, 0)()
-        self.finished = ct.pointer(ct.c_bool(False))
-        self.idx = ct.pointer(ct.c_uint64(0))
+        self._np = np.empty(0, dtype=np.uint32)
+        self.data = (ct.c_uint32 * 0).from_buffer(self._np)
+        self._storeNp = np.empty(0, dtype=np.uint32)
+        self.storeData = (ct.c_uint32 * 0).from_buffer(self._storeNp)
+        self._finished = ct.c_bool(False)
+        self._idx = ct.c_uint64(0)
+        self._blockSize = ct.c_uint64(0)
+        self.finished = ct.pointer(self._finished)
+        self.idx = ct.pointer(self._idx)
+        self._measMode = None
+        self._histogramMode = False
+        self._numChans = 0
+        self._splitKernel = None
+
+
+    def _refresh(self):
+        # caches the measurement mode of the deviceConfig, called by snAPI.getDeviceConfig
+        self._measMode = int(self.parent.deviceConfig["MeasMode"])
+        self._histogramMode = (self._measMode == MeasMode.Histogram.value)
+        self._numChans = int(self.parent.deviceConfig["NumChans"])
+        # the record format is fixed by the MeasMode, so the split kernel is chosen once here
+        if self._measMode == MeasMode.T2.value:
+            self._splitKernel = _tttr_kernels.split_T2
+        elif self._measMode == MeasMode.T3.value:
+            self._splitKernel = _tttr_kernels.split_T3
+        else:
+            self._splitKernel = None
         
 
     def measure(self, acqTime: typing.Optional[int] = 1000, size: typing.Optional[int] = 134217728, waitFinished: typing.Optional[bool] = True, savePTU: typing.Optional[bool] = False):
@@ -2858,12 +3283,13 @@ Example
     sn.raw.measure(1000, 134217728, True, True)
     
         """
-        self.data = ct.ARRAY(ct.c_uint32, size)()
-        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.parent.logPrint( "measurement is not supported for Raw class in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
+        if self._histogramMode:
+            self.parent.logPrint( "measurement is not supported for Raw class in MeasMode:", MeasMode.Histogram.name)
             return False
-        self.parent.dll.rawMeasure.restype = ct.c_bool
-        return self.parent.dll.rawMeasure(acqTime, waitFinished, savePTU, ct.byref(self.data), self.idx, ct.c_uint64(size), self.finished)
+        # each measurement gets a new buffer, because the caller may keep the arrays of getData
+        self._np = np.empty(size, dtype=np.uint32)
+        self.data = (ct.c_uint32 * size).from_buffer(self._np)
+        return self.parent.dll.rawMeasure(acqTime, waitFinished, savePTU, ct.byref(self.data), ct.byref(self._idx), ct.c_uint64(size), ct.byref(self._finished))
     
 
     def startBlock(self, acqTime: typing.Optional[int] = 1000, size: typing.Optional[int] = 134217728, savePTU: typing.Optional[bool] = False):
@@ -2914,13 +3340,14 @@ Example
             sn.logPrint(f"{sn.raw.numRead()} records read")
     
         """
-        self.storeData = ct.ARRAY(ct.c_uint32, size)()
-        self.data = ct.ARRAY(ct.c_uint32, size)()
-        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.parent.logPrint( "startBlock is not supported for Raw class in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
+        if self._histogramMode:
+            self.parent.logPrint( "startBlock is not supported for Raw class in MeasMode:", MeasMode.Histogram.name)
             return False
-        self.parent.dll.rawStartBlock.restype = ct.c_bool
-        return self.parent.dll.rawStartBlock(acqTime, savePTU, ct.byref(self.storeData), ct.c_uint64(size), self.finished)
+        self._storeNp = np.empty(size, dtype=np.uint32)
+        self.storeData = (ct.c_uint32 * size).from_buffer(self._storeNp)
+        self._np = np.empty(size, dtype=np.uint32)
+        self.data = (ct.c_uint32 * size).from_buffer(self._np)
+        return self.parent.dll.rawStartBlock(acqTime, savePTU, ct.byref(self.storeData), ct.c_uint64(size), ct.byref(self._finished))
     
 
     def getBlock(self):
@@ -2952,13 +3379,13 @@ Example
             sn.logPrint(f"{sn.raw.numRead()} records read")
     
         """
-        size = ct.pointer(ct.c_uint64(0))
-        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.parent.logPrint( "startBlock is not supported for Raw class in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
-            self.idx.contents.value = 0
+        if self._histogramMode:
+            self.parent.logPrint( "startBlock is not supported for Raw class in MeasMode:", MeasMode.Histogram.name)
+            self._idx.value = 0
         else:
-            self.parent.dll.rawGetBlock(ct.byref(self.data), size)
-            self.idx.contents.value = size.contents.value
+            self._blockSize.value = 0
+            self.parent.dll.rawGetBlock(ct.byref(self.data), ct.byref(self._blockSize))
+            self._idx.value = self._blockSize.value
         return self.getData()
     
 
@@ -2999,11 +3426,10 @@ Example
         if not numRead:
             numRead = self.numRead()
             
-        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.parent.logPrint( "getData is not supported for Raw class in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
+        if self._histogramMode:
+            self.parent.logPrint( "getData is not supported for Raw class in MeasMode:", MeasMode.Histogram.name)
             return []
-        return np.lib.stride_tricks.as_strided(self.data, shape=(1, numRead),
-            strides=(ct.sizeof(self.data._type_) * numRead, ct.sizeof(self.data._type_)))[0]
+        return self._np[:numRead]
     
 
     def numRead(self):
@@ -3028,7 +3454,7 @@ Example
         sn.logPrint(f"{sn.raw.numRead()} data records")
     
         """
-        return self.idx.contents.value
+        return self._idx.value
     
 
     def isFinished(self):
@@ -3071,7 +3497,7 @@ Example
             break
     
         """
-        return self.finished.contents.value
+        return self._finished.value
         
 
     def stopMeasure(self):
@@ -3220,12 +3646,12 @@ Example
 -------
 ::
 
-    # counts the number of records by the channel number
-    cnts  = [0] * sn.deviceConfig["NumChans"] + 1
-    for i in range(sn.raw.numRead()):
-        if not sn.raw.isMarker(data[i]):
-            chanIdx = sn.raw.channel(data[i])
-            cnts[chanIdx] += 1
+    # prints the channel number of a record that is not a special record
+    if not sn.raw.isSpecial(data[i]):
+        sn.logPrint(sn.raw.channel(data[i]))
+    
+    # to count the number of records by the channel number use :meth:`channelHistogram`
+    cnts = sn.raw.channelHistogram(data)
 
         """
         return ((data >> 25) &  0x0000003F) + 1
@@ -3253,10 +3679,7 @@ Example
         ...
     
         """
-        c = self.channel(data) - 1
-        if self.isSpecial(data) and (c >= 1) and (c <= 15):
-            self.parent.logPrint(data, self.isSpecial(data), self.isSpecial(data) and (c >= 1) and (c <= 15), c)
-        return (self.isSpecial(data) and (c >= 1) and (c <= 15))
+        return _IS_MARKER_LUT[(data >> 25) & 0x7F]
 
     def markers(self, data: int) :
         """
@@ -3286,104 +3709,526 @@ Example
                 ...
 
         """
-        m = self.channel(data) - 1
-        m = (0x7F & m)
-        return [(m & 0x01) != 0, (m & 0x02) != 0, (m & 0x04) != 0, (m & 0x08) != 0]
+        if isinstance(data, np.ndarray):
+            return _MARKER_LUT[(data >> 25) & 0x0F]
+        # a single record returns a new list like before
+        return _MARKER_LUT[(int(data) >> 25) & 0x0F].tolist()
     
 
+    def markers_batch(self, data: np.ndarray) :
+        """
+This function takes an array of T2 or T3 `Raw` marker records and returns an array holding the 4 possible
+markers of each record. It is the vectorized version of :meth:`markers`.
 
-class Unfold():
-    """This is the `Unfold` measurement class.
-
-This measurement class can be used to conveniently access the TTTR (Time Tagged Time-Resolved) data. 
-The format does not depend on the :class:`.MeasMode` in the :meth:`snAPI.initDevice` function,
-but in the :obj:`.MeasMode.T3`, the sync records are removed to increase the throughput on the usb bus.
-
-Note
-----
-    This class was created to provide a better user experience than the `Raw` data class. The overflow records
-    have been removed an the timetags now have a width of 64Bit. The channel information is stored in a separate
-    array.
+Warning
+-------
+    Only use this function with marker records. Check them with :meth:`isMarkers` before.
+    
+Parameters
+----------
+    data: NDArray[int]
+        `Raw` data marker records
         
-There are special functions to decode the channel information:
-    - :meth:`isMarker`
-    - :meth:`markers`
+Returns
+-------
+    NDArray[bool]: shape (len(data), 4)
 
-.. seealso ::
-    | To fully understand the TTTR format read
-    | :fa:`file-pdf` `Time Tagged Time-Resolved Fluorescence Data Collection in Life Sciences <https://www.picoquant.com/images/uploads/page/files/14528/technote_tttr.pdf>`_
+Example
+-------
+::
 
-    """
-        
+    # gets the records with the marker 2 set
+    data = sn.raw.getData()
+    markerRecords = data[sn.raw.isMarkers(data)]
+    marker2 = markerRecords[sn.raw.markers_batch(markerRecords)[:, 1]]
+    
+        """
+        return _MARKER_LUT[(np.asarray(data) >> 25) & 0x0F]
 
-    def __init__(self, parent):
-        self.parent = parent
-        self.times = ct.ARRAY(ct.c_uint64, 0)()
-        self.channels = ct.ARRAY(ct.c_uint8, 0)()
-        self.idx = ct.pointer(ct.c_uint64(0))
-        self.finished = ct.pointer(ct.c_bool(False))
 
-    def measure(self, acqTime: typing.Optional[int] = 1000, size: typing.Optional[int] = 134217728, waitFinished: typing.Optional[bool] = True, savePTU: typing.Optional[bool] = False):
+    def isSpecials(self, data: np.ndarray) :
         """
-With this function a simple measurement of Unfolded data records into RAM and/or disc is provided.
-Beforehand, you must define the size of the buffer that is unfold.data. If waitFinished is set `True` the call
-will block until the measurement is completed. If `waitFinished` is set `False` (default) you can get
-updates on the fly, and you can request the execution status with the :meth:`isFinished` function.
-If you wish to avoid blocking you can set `waitFinished` `False` and proceed with other code. Again, you
-can check if the measurement is completed by using the :meth:`isFinished` function.
-The data can be accessed with :meth:`getData`.
-
-See:
-    | :octicon:`mark-github` `Demo_RecordViewer_UF <https://github.com/PicoQuant/snAPI/blob/main/demos/Demo_RecordViewer_UF.py>`_
+This function takes an array of T2 or T3 `Raw` data records and returns a boolean array that is `True` for
+the special records. It is the vectorized version of :meth:`isSpecial`.
 
-Caution
--------
-The `Unfold buffer overrun - clearing!` warning or `Unfold Buffer full - waiting!` info means, that data could not be stored
-in the allocated memory. Increase the memory by the `size` parameter, use the non blocking measure or block read 
-functions the :meth:`startBlock` and :meth:`getBlock` instead!
-    
 Parameters
 ----------
-    acqTime: int (default: 1s)
-        | 0: means the measurement will run until :meth:`stopMeasure`
-        | acquisition time [ms]
-        | will be ignored if device is a FileDevice
-    size: int number of records (default: 1 billion records = 8GB)
-        memory size for the data array
-    waitFinished: bool (default: True)
-        True: block execution until finished (will be False on acqTime = 0)
-    savePTU: bool (default: False)
-        Save data to ptu file
-
+    data: NDArray[int]
+        `Raw` data records
+        
 Returns
 -------
-    True: operation successful
-    False: operation failed
+    NDArray[bool]:
+        True: the data record is a special record
 
 Example
 -------
 ::
 
-    # reads `Unfold` data for 1 sec in :obj:`.MeasMode.T2`
-    sn = snAPI()
-    sn.getDevice()
-    sn.initDevice(MeasMode.T2)
-    sn.unfold.measure(1000)
-    data = sn.unfold.getData()
-    sn.logPrint(f"{len(data)} records read")
+    # number of special records in the `Raw` data
+    data = sn.raw.getData()
+    sn.logPrint(f"{np.count_nonzero(sn.raw.isSpecials(data))} special records")
+    
+        """
+        return (np.asarray(data) & 0x80000000) != 0
+    
+
+    def timeTags_T2(self, data: np.ndarray) :
+        """
+This function takes an array of T2 `Raw` data records and returns the timetags. It is the vectorized version of
+:meth:`timeTag_T2`.
+
+Warning
+-------
+    Do not use this function with T3 `Raw` data records.
+    
+Parameters
+----------
+    data: NDArray[int]
+        T2 `Raw` data records
+        
+Returns
+-------
+    NDArray[int]:
+        timetags
+
+Example
+-------
+::
+
+    # gets the timetags of the T2 `Raw` data
+    data = sn.raw.getData()
+    timeTags = sn.raw.timeTags_T2(data)
+    
+        """
+        return np.asarray(data) & 0x01FFFFFF
+    
+
+    def nSyncs_T3(self, data: np.ndarray) :
+        """
+This function takes an array of T3 `Raw` data records and returns the numbers of the sync periods the events
+occurred in. It is the vectorized version of :meth:`nSync_T3`.
+
+Warning
+-------
+    Do not use this function with T2 `Raw` data records.
+    
+Parameters
+----------
+    data: NDArray[int]
+        T3 `Raw` data records
+        
+Returns
+-------
+    NDArray[int]:
+        numbers of the sync periods
+
+Example
+-------
+::
+
+    # gets the sync period numbers of the T3 `Raw` data
+    data = sn.raw.getData()
+    nSyncs = sn.raw.nSyncs_T3(data)
+    
+        """
+        return np.asarray(data) & 0x000003FF
+    
+
+    def dTimes_T3(self, data: np.ndarray) :
+        """
+This function takes an array of T3 `Raw` data records and returns the differential times. It is the vectorized
+version of :meth:`dTime_T3`.
+
+Warning
+-------
+    Do not use this function with T2 `Raw` data records.
+    
+Parameters
+----------
+    data: NDArray[int]
+        T3 `Raw` data records
+        
+Returns
+-------
+    NDArray[int]:
+        differential times
+
+Example
+-------
+::
+
+    # gets the differential times of the T3 `Raw` data
+    data = sn.raw.getData()
+    dTimes = sn.raw.dTimes_T3(data)
+    
+        """
+        return (np.asarray(data) >> 10) & 0x00007FFF
+    
+
+    def channels(self, data: np.ndarray) :
+        """
+This function takes an array of T2 or T3 `Raw` data records and returns the channel numbers. It is the vectorized
+version of :meth:`channel`. The channel numbers of special records are not valid. Check them with :meth:`isMarkers`
+or :meth:`isSpecials`.
+
+Parameters
+----------
+    data: NDArray[int]
+        `Raw` data records
+        
+Returns
+-------
+    NDArray[int]:
+        channel numbers
+
+Example
+-------
+::
+
+    # counts the number of records by the channel number
+    data = sn.raw.getData()
+    chans = sn.raw.channels(data[~sn.raw.isSpecials(data)])
+    cnts = np.bincount(chans, minlength=sn.deviceConfig["NumChans"] + 1)
+    
+        """
+        return ((np.asarray(data) >> 25) & 0x0000003F) + 1
+    
+
+    def isMarkers(self, data: np.ndarray) :
+        """
+This function takes an array of T2 or T3 `Raw` data records and returns a boolean array that is `True` for
+the marker records. It is the vectorized version of :meth:`isMarker`.
+
+Parameters
+----------
+    data: NDArray[int]
+        `Raw` data records
+        
+Returns
+-------
+    NDArray[bool]:
+        True: the data record is a marker record
+
+Example
+-------
+::
+
+    # gets the marker records of the `Raw` data
+    data = sn.raw.getData()
+    markerRecords = data[sn.raw.isMarkers(data)]
+    
+        """
+        return _IS_MARKER_LUT[(np.asarray(data) >> 25) & 0x7F]
+
+
+    def classify(self, data: typing.Optional[np.ndarray] = None, packed: typing.Optional[bool] = False):
+        """
+This function decodes an array of T2 or T3 `Raw` data records in one call. It returns the special and marker flags,
+the channel numbers and the payload of the records. The payload is the timetag in :obj:`.MeasMode.T2` and
+the differential time in :obj:`.MeasMode.T3`.
+
+Parameters
+----------
+    data: NDArray[int] (default: None)
+        `Raw` data records (default: the data of the current measurement :meth:`getData`)
+    packed: bool (default: False)
+        True: the special and marker flags are returned as bitmaps packed with `np.packbits`
+
+Returns
+-------
+    isSpecial: NDArray[bool]
+        True: the data record is a special record
+    isMarker: NDArray[bool]
+        True: the data record is a marker record
+    channel: NDArray[int]
+        channel numbers
+    payload: NDArray[int]
+        timetags (T2) or differential times (T3)
+
+Example
+-------
+::
+
+    # counts the photons per channel of the `Raw` data
+    isSpecial, isMarker, channel, payload = sn.raw.classify()
+    cnts = np.bincount(channel[~isSpecial], minlength=sn.deviceConfig["NumChans"] + 1)
+    
+        """
+        if data is None:
+            data = self.getData()
+        data = np.asarray(data, dtype=np.uint32)
+        isSpecial = self.isSpecials(data)
+        c = (data >> 25) & 0x0000003F
+        isMarker = isSpecial & (c >= 1) & (c <= 15)
+        if self._measMode == MeasMode.T2.value:
+            payload = self.timeTags_T2(data)
+        else:
+            payload = self.dTimes_T3(data)
+        if packed:
+            isSpecial = np.packbits(isSpecial)
+            isMarker = np.packbits(isMarker)
+        return isSpecial, isMarker, c + 1, payload
+
+
+    def unfoldT2(self, data: typing.Optional[np.ndarray] = None):
+        """
+This function unfolds T2 `Raw` data records in the python process. The overflow records are removed and the
+timetags are returned with a width of 64 bit. The result has the same format as the data of the :class:`Unfold` class.
+
+Parameters
+----------
+    data: NDArray[int] (default: None)
+        T2 `Raw` data records (default: the data of the current measurement :meth:`getData`)
+
+Returns
+-------
+    times: NDArray[uint64]
+        timetags
+    channels: NDArray[uint8]
+        channel numbers starting at 0 for the sync channel and 1 for channel 1, marker records have the bit 0x80 set
+
+Example
+-------
+::
+
+    # reads `Raw` data for 1 sec in :obj:`.MeasMode.T2` and unfolds it
+    sn.raw.measure(1000)
+    times, channels = sn.raw.unfoldT2()
+    
+        """
+        if self._measMode != MeasMode.T2.value:
+            self.parent.logPrint( "unfoldT2 is not supported for Raw class in MeasMode:", MeasMode(self._measMode).name)
+            return np.empty(0, np.uint64), np.empty(0, np.uint8)
+        if data is None:
+            data = self.getData()
+        return _tttr_kernels.unfold_T2(data)
+    
+
+    def unfoldT3(self, data: typing.Optional[np.ndarray] = None):
+        """
+This function unfolds T3 `Raw` data records in the python process. The overflow records are removed and the
+timetags are returned with a width of 64 bit. The result has the same format as the data of the :class:`Unfold` class,
+so the timetags can be decoded with :meth:`Unfold.nSync_T3` and :meth:`Unfold.dTime_T3`.
+
+Parameters
+----------
+    data: NDArray[int] (default: None)
+        T3 `Raw` data records (default: the data of the current measurement :meth:`getData`)
+
+Returns
+-------
+    times: NDArray[uint64]
+        timetags (nSync << 15 | dTime)
+    channels: NDArray[uint8]
+        channel numbers starting at 1 for channel 1, marker records have the bit 0x80 set
+
+Example
+-------
+::
+
+    # reads `Raw` data for 1 sec in :obj:`.MeasMode.T3` and unfolds it
+    sn.raw.measure(1000)
+    times, channels = sn.raw.unfoldT3()
+    
+        """
+        if self._measMode != MeasMode.T3.value:
+            self.parent.logPrint( "unfoldT3 is not supported for Raw class in MeasMode:", MeasMode(self._measMode).name)
+            return np.empty(0, np.uint64), np.empty(0, np.uint8)
+        if data is None:
+            data = self.getData()
+        return _tttr_kernels.unfold_T3(data)
+    
+
+    def split(self, data: typing.Optional[np.ndarray] = None):
+        """
+This function splits T2 or T3 `Raw` data records into separate arrays of timetags, channels and marker flags.
+The kernel for the record format of the current :class:`.MeasMode` is selected when the device is initialized.
+The overflow records are removed and the timetags and channels have the same format as with :meth:`unfoldT2`
+and :meth:`unfoldT3`.
+
+Parameters
+----------
+    data: NDArray[int] (default: None)
+        `Raw` data records (default: the data of the current measurement :meth:`getData`)
+
+Returns
+-------
+    times: NDArray[uint64]
+        timetags (T2: timetag, T3: nSync << 15 | dTime)
+    channels: NDArray[uint8]
+        channel numbers, marker records have the bit 0x80 set
+    isMarker: NDArray[bool]
+        True: the record is a marker record
+
+Example
+-------
+::
+
+    # gets the timetags of the photons of channel 1
+    sn.raw.measure(1000)
+    times, channels, isMarker = sn.raw.split()
+    times1 = times[channels == 1]
+    
+        """
+        if self._splitKernel is None:
+            self.parent.logPrint( "split is not supported for Raw class in MeasMode:", MeasMode(self._measMode).name)
+            return np.empty(0, np.uint64), np.empty(0, np.uint8), np.empty(0, bool)
+        if data is None:
+            data = self.getData()
+        return self._splitKernel(data)
+    
+
+    def channelHistogram(self, data: typing.Optional[np.ndarray] = None):
+        """
+This function counts the T2 or T3 `Raw` data records by their channel number. The overflow and marker records
+are not counted. In :obj:`.MeasMode.T2` index 0 holds the number of sync records.
+
+Parameters
+----------
+    data: NDArray[int] (default: None)
+        `Raw` data records (default: the data of the current measurement :meth:`getData`)
+
+Returns
+-------
+    NDArray[int]:
+        number of records per channel, index 0 is the sync channel and 1 is channel 1
+
+Example
+-------
+::
+
+    # counts the number of records by the channel number
+    sn.raw.measure(1000)
+    cnts = sn.raw.channelHistogram()
+    sn.logPrint(f"channel 1: {cnts[1]} counts")
+    
+        """
+        if data is None:
+            data = self.getData()
+        data = np.asarray(data, dtype=np.uint32)
+        chan = (data >> 25) & 0x0000003F
+        special = (data & 0x80000000) != 0
+        # the only counted special records are the T2 sync records with channel field 0
+        counted = ~special | (chan == 0)
+        return np.bincount(np.where(special, 0, chan + 1)[counted], minlength=self._numChans + 1)
+    
+
+
+class Unfold():
+    """This is the `Unfold` measurement class.
+
+This measurement class can be used to conveniently access the TTTR (Time Tagged Time-Resolved) data. 
+The format does not depend on the :class:`.MeasMode` in the :meth:`snAPI.initDevice` function,
+but in the :obj:`.MeasMode.T3`, the sync records are removed to increase the throughput on the usb bus.
+
+Note
+----
+    This class was created to provide a better user experience than the `Raw` data class. The overflow records
+    have been removed an the timetags now have a width of 64Bit. The channel information is stored in a separate
+    array.
+        
+There are special functions to decode the channel information:
+    - :meth:`isMarker`
+    - :meth:`markers`
+
+.. seealso ::
+    | To fully understand the TTTR format read
+    | :fa:`file-pdf` `Time Tagged Time-Resolved Fluorescence Data Collection in Life Sciences <https://www.picoquant.com/images/uploads/page/files/14528/technote_tttr.pdf>`_
+
+    """
+        
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.times = ct.ARRAY(ct.c_uint64, 0)()
+        self.channels = ct.ARRAY(ct.c_uint8, 0)()
+        self.storeTimes = ct.ARRAY(ct.c_uint64, 0)()
+        self.storeChannels = ct.ARRAY(ct.c_uint8, 0)()
+        self._idx = ct.c_uint64(0)
+        self._finished = ct.c_bool(False)
+        self.idx = ct.pointer(self._idx)
+        self.finished = ct.pointer(self._finished)
+        self._blockSize = ct.c_uint64(0)
+        self._measMode = None
+        self._histogramMode = False
+
+
+    def _refresh(self):
+        # caches the measurement mode of the deviceConfig, called by snAPI.getDeviceConfig
+        self._measMode = int(self.parent.deviceConfig["MeasMode"])
+        self._histogramMode = (self._measMode == MeasMode.Histogram.value)
+
+
+    @staticmethod
+    def _allocBuffers(size):
+        # one contiguous arena holds the times (8 bytes/record) followed by the channels (1 byte/record)
+        # the arena is kept alive by the two arrays that are created from it
+        arena = (ct.c_uint8 * (size * 9))()
+        times = (ct.c_uint64 * size).from_buffer(arena, 0)
+        channels = (ct.c_uint8 * size).from_buffer(arena, size * 8)
+        return times, channels
+
+
+    def measure(self, acqTime: typing.Optional[int] = 1000, size: typing.Optional[int] = 134217728, waitFinished: typing.Optional[bool] = True, savePTU: typing.Optional[bool] = False):
+        """
+With this function a simple measurement of Unfolded data records into RAM and/or disc is provided.
+Beforehand, you must define the size of the buffer that is unfold.data. If waitFinished is set `True` the call
+will block until the measurement is completed. If `waitFinished` is set `False` (default) you can get
+updates on the fly, and you can request the execution status with the :meth:`isFinished` function.
+If you wish to avoid blocking you can set `waitFinished` `False` and proceed with other code. Again, you
+can check if the measurement is completed by using the :meth:`isFinished` function.
+The data can be accessed with :meth:`getData`.
+
+See:
+    | :octicon:`mark-github` `Demo_RecordViewer_UF <https://github.com/PicoQuant/snAPI/blob/main/demos/Demo_RecordViewer_UF.py>`_
+
+Caution
+-------
+The `Unfold buffer overrun - clearing!` warning or `Unfold Buffer full - waiting!` info means, that data could not be stored
+in the allocated memory. Increase the memory by the `size` parameter, use the non blocking measure or block read 
+functions the :meth:`startBlock` and :meth:`getBlock` instead!
+    
+Parameters
+----------
+    acqTime: int (default: 1s)
+        | 0: means the measurement will run until :meth:`stopMeasure`
+        | acquisition time [ms]
+        | will be ignored if device is a FileDevice
+    size: int number of records (default: 1 billion records = 8GB)
+        memory size for the data array
+    waitFinished: bool (default: True)
+        True: block execution until finished (will be False on acqTime = 0)
+    savePTU: bool (default: False)
+        Save data to ptu file
+
+Returns
+-------
+    True: operation successful
+    False: operation failed
+
+Example
+-------
+::
+
+    # reads `Unfold` data for 1 sec in :obj:`.MeasMode.T2`
+    sn = snAPI()
+    sn.getDevice()
+    sn.initDevice(MeasMode.T2)
+    sn.unfold.measure(1000)
+    data = sn.unfold.getData()
+    sn.logPrint(f"{len(data)} records read")
     
     # this reads `Unfold` data for 1 sec in :obj:`.MeasMode.T2` and write it to disc only
     sn.unfold.measure(1000, 134217728, True, True)
     
         """
-        self.times = ct.ARRAY(ct.c_uint64, size)()
-        self.channels = ct.ARRAY(ct.c_uint8, size)()
-        self.idx = ct.pointer(ct.c_uint64(0))
-        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.parent.logPrint( "measurement is not supported for Unfold class in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
+        if self._histogramMode:
+            self.parent.logPrint( "measurement is not supported for Unfold class in MeasMode:", MeasMode.Histogram.name)
             return False
-        self.parent.dll.ufMeasure.restype = ct.c_bool
-        return self.parent.dll.ufMeasure(acqTime, waitFinished, savePTU, ct.byref(self.times), ct.byref(self.channels), self.idx, ct.c_uint64(size), self.finished)
+        self.times, self.channels = self._allocBuffers(size)
+        self._idx.value = 0
+        return self.parent.dll.ufMeasure(acqTime, waitFinished, savePTU, ct.byref(self.times), ct.byref(self.channels), ct.byref(self._idx), ct.c_uint64(size), ct.byref(self._finished))
     
 
     def startBlock(self, acqTime: int= 1000, size: int = 134217728, savePTU: typing.Optional[bool] = False):
@@ -3438,15 +4283,13 @@ Example
             sn.logPrint(f"{sn.unfold.numRead()} records read")
     
         """
-        self.storeTimes = ct.ARRAY(ct.c_uint64, size)()
-        self.storeChannels = ct.ARRAY(ct.c_uint8, size)()
-        self.times = ct.ARRAY(ct.c_uint64, size)()
-        self.channels = ct.ARRAY(ct.c_uint8, size)()
-        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.parent.logPrint( "startBlock is not supported for Unfold class in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
+        if self._histogramMode:
+            self.parent.logPrint( "startBlock is not supported for Unfold class in MeasMode:", MeasMode.Histogram.name)
             return False
-        self.parent.dll.ufStartBlock.restype = ct.c_bool
-        return self.parent.dll.ufStartBlock(acqTime, savePTU, ct.byref(self.storeTimes), ct.byref(self.storeChannels), ct.c_uint64(size), self.finished)
+        # each block measurement gets new buffers, because getData returns views of them
+        self.storeTimes, self.storeChannels = self._allocBuffers(size)
+        self.times, self.channels = self._allocBuffers(size)
+        return self.parent.dll.ufStartBlock(acqTime, savePTU, ct.byref(self.storeTimes), ct.byref(self.storeChannels), ct.c_uint64(size), ct.byref(self._finished))
     
 
     def getBlock(self):
@@ -3481,13 +4324,13 @@ Example
             sn.logPrint(f"{sn.unfold.numRead()} records read")
     
         """
-        size = ct.pointer(ct.c_uint64(0))
-        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.parent.logPrint( "startBlock is not supported for Unfold class in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
-            self.idx.contents.value = 0
+        if self._histogramMode:
+            self.parent.logPrint( "startBlock is not supported for Unfold class in MeasMode:", MeasMode.Histogram.name)
+            self._idx.value = 0
         else:
-            self.parent.dll.ufGetBlock(ct.byref(self.times), ct.byref(self.channels), size)
-            self.idx.contents.value = size.contents.value
+            self._blockSize.value = 0
+            self.parent.dll.ufGetBlock(ct.byref(self.times), ct.byref(self.channels), ct.byref(self._blockSize))
+            self._idx.value = self._blockSize.value
         return self.getData()
     
 
@@ -3565,8 +4408,7 @@ Example
     times = sn.unfold.getTimes()
     
         """
-        return np.lib.stride_tricks.as_strided(self.times, shape=(1, numRead),
-            strides=(ct.sizeof(self.times._type_) * numRead, ct.sizeof(self.times._type_)))[0]
+        return np.frombuffer(self.times, dtype=np.uint64, count=numRead)
     
 
     def getChannels(self, numRead: int):
@@ -3600,8 +4442,7 @@ Example
     chans = sn.unfold.getChannels()
     
         """
-        return np.lib.stride_tricks.as_strided(self.channels, shape=(1, numRead),
-            strides=(ct.sizeof(self.channels._type_) * numRead, ct.sizeof(self.channels._type_)))[0]
+        return np.frombuffer(self.channels, dtype=np.uint8, count=numRead)
     
 
     def numRead(self):
@@ -3626,7 +4467,7 @@ Example
         sn.logPrint(f"{sn.unfold.numRead()} data records")
     
         """
-        return self.idx.contents.value
+        return self._idx.value
     
 
     def isFinished(self):
@@ -3669,7 +4510,7 @@ Example
             break
     
         """
-        return self.finished.contents.value
+        return self._finished.value
     
 
     def stopMeasure(self):
@@ -3719,23 +4560,27 @@ Example
     
         """
         if not size:
-            size = self.numRead()
-        timesOut = ct.ARRAY(ct.c_uint64, size)()
+            # all data is in RAM, so the times are selected in place without a call into the API
+            numRead = self.numRead()
+            return self.getTimes(numRead)[self.getChannels(numRead) == channel]
+        # each call gets a new output buffer, so the result of a previous call is not overwritten
+        timesOutNp = np.empty(size, dtype=np.uint64)
+        timesOut = (ct.c_uint64 * size).from_buffer(timesOutNp)
         size = ct.pointer(ct.c_uint64(size))
         if size.contents.value > 0:
             self.parent.dll.getTimesFromChannelUF(ct.byref(self.channels), ct.byref(self.times), ct.byref(timesOut), channel, size)
-        return np.lib.stride_tricks.as_strided(timesOut, shape=(1, size.contents.value),
-            strides=(ct.sizeof(timesOut._type_) * size.contents.value, ct.sizeof(timesOut._type_)))[0]
+        return timesOutNp[:size.contents.value]
     
 
     def isMarker(self, channel) :
         """
 This function takes a T2 or T3 `Unfold` channel record and returns `True` if it is a marker record.
+It also takes the whole channel array and returns a boolean array.
 
 Parameters
 ----------
-    data: int
-        a `Unfold` channel record
+    data: int | NDArray[int]
+        a `Unfold` channel record or an array of channel records
 Returns
 -------
     True: the given channel record is a marker record
@@ -3749,13 +4594,20 @@ Example
     if sn.unfold.isMarker(channels[i]):
         ...
     
+    # gets the timetags of all marker records
+    markerTimes = times[sn.unfold.isMarker(channels)]
+    
         """
-        return ((0x80 & channel) != 0) 
+        if isinstance(channel, np.ndarray):
+            return (channel & 0x80) != 0
+        # a single record is handled with the python bit operations
+        return (int(channel) & 0x80) != 0
     
 
     def markers(self, channel) :
         """
 This function takes an `Unfold` data record and returns an array of the four possible markers signals.
+For an array of marker records an array of the shape (N, 4) is returned.
 
 Warning
 -------
@@ -3780,8 +4632,10 @@ Example
             ...
 
         """
-        marker = (0x7F & channel)
-        return [(marker & 0x01) != 0, (marker & 0x02) != 0, (marker & 0x04) != 0, (marker & 0x08) != 0]
+        if isinstance(channel, np.ndarray):
+            return _MARKER_LUT[channel & 0x0F]
+        # a single record returns a new list like before
+        return _MARKER_LUT[int(channel) & 0x0F].tolist()
 
     def abs_T3(self, times: int) :
         """
@@ -3817,7 +4671,7 @@ Example
             
         return (self.nSync_T3(times) / self.parent.measDescription['AveSyncRate'] * 1e12 + self.parent.deviceConfig['Resolution'] * self.dTime_T3(times))
 
-    def nSync_T3(self, times: int) :
+    def nSync_T3(self, times: int, out: typing.Optional[np.ndarray] = None) :
         """
 This function takes a T3 `Unfold` timetag and returns the number of the sync period this event occurred in.
 
@@ -3829,6 +4683,10 @@ Parameters
 ----------
     data: int
         a T3 timetag
+    out: NDArray[uint64]
+        | optional uint64 buffer for the result, if an array of timetags is given (default: None)
+        | a scratch buffer can be reused in loops to avoid temporary arrays
+        | raises a ValueError if it is not a uint64 array
         
 Returns
 -------
@@ -3843,10 +4701,13 @@ Example
     sn.print(sn.unfold.nSync_T3(times[i]))
     
         """
-        return (times.astype(np.int64) >> 15).astype(np.uint64)
+        if out is None and not isinstance(times, np.ndarray):
+            # a single timetag is handled with the python bit operations
+            return int(times) >> 15
+        return _tttr_kernels.nsync_T3(times, out=out)
     
 
-    def dTime_T3(self, times: int) :
+    def dTime_T3(self, times: int, out: typing.Optional[np.ndarray] = None) :
         """
 This function takes a T3 `Unfold` timetag and returns the differential time slot. For the differential time
 it has to be multiplied by the Resolution.
@@ -3859,6 +4720,10 @@ Parameters
 ----------
     data: int
         a T3 `Unfold` timetag
+    out: NDArray[uint64]
+        | optional uint64 buffer for the result, if an array of timetags is given (default: None)
+        | a scratch buffer can be reused in loops to avoid temporary arrays
+        | raises a ValueError if it is not a uint64 array
         
 Returns
 -------
@@ -3872,7 +4737,44 @@ Example
     sn.print(sn.deviceConfig['Resolution'] * sn.unfold.dTime_T3(times[i]))
     
         """
-        return (0x00007FFF & times.astype(np.int64)).astype(np.uint64)
+        if out is None and not isinstance(times, np.ndarray):
+            return int(times) & 0x7FFF
+        return _tttr_kernels.dtime_T3(times, out=out)
+    
+
+    def splitT3(self, times: np.ndarray) :
+        """
+This function takes an array of T3 `Unfold` timetags and returns the numbers of the sync periods and the
+differential time slots in one call. It is equivalent to calling :meth:`nSync_T3` and :meth:`dTime_T3`.
+
+Warning
+-------
+    Use this function with T3 `Unfold` timetags only.
+    
+Parameters
+----------
+    times: NDArray[uint64]
+        T3 `Unfold` timetags
+        
+Returns
+-------
+    nSync: NDArray[uint64]
+        numbers of the sync periods
+    dTime: NDArray[uint64]
+        differential time slots
+
+Example
+-------
+::
+
+    # gets the sync periods and the differential times [ps] of the `Unfold` T3 data
+    times, channels = sn.unfold.getData()
+    nSync, dTime = sn.unfold.splitT3(times)
+    dTime = dTime * sn.deviceConfig['Resolution']
+    
+        """
+        times = np.asarray(times, dtype=np.uint64)
+        return _tttr_kernels.nsync_T3(times), _tttr_kernels.dtime_T3(times)
     
 
 class Histogram():
@@ -3906,12 +4808,15 @@ to use the :obj:`.MeasMode.T2` instead.
 
     def __init__(self, parent):
         self.parent = parent
-        self.data = ct.ARRAY(ct.c_long, 0)()
+        self.data = ct.ARRAY(ct.c_int32, 0)()
         self.numBins = 0
         self.T2binWidth = 0
-        self.bins = np.array(range(self.numBins), dtype='i8')
+        self.bins = np.arange(self.numBins, dtype=np.int64)
+        self._binsKey = None
+        self._numChans = 0
         
-        self.finished = ct.pointer(ct.c_bool(False))
+        self._finished = ct.c_bool(False)
+        self.finished = ct.pointer(self._finished)
         
 
     def setRefChannel(self, channel: typing.Optional[int] = 0) :
@@ -3948,7 +4853,6 @@ Example
         """
         if(self.parent.deviceConfig["MeasMode"] != MeasMode.T2.value):
             self.parent.logPrint( "setRefChannel is not supported in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
-        self.parent.dll.setHistoT2RefChan.argtypes = [ct.c_uint8]
         self.parent.dll.setHistoT2RefChan(channel)
 
 
@@ -3988,7 +4892,6 @@ Example
         if(self.parent.deviceConfig["MeasMode"] != MeasMode.T2.value):
             self.parent.logPrint( "setBinWidth is not supported in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
         self.T2binWidth = binWidth
-        self.parent.dll.setHistoT2BinWidth.argtypes = [ct.c_uint64]
         self.parent.dll.setHistoT2BinWidth(binWidth)
 
 
@@ -4043,19 +4946,29 @@ Example
         self.numBins = self.parent.deviceConfig["NumBins"]
         if self.T2binWidth == 0:
             self.T2binWidth = self.parent.deviceConfig["BaseResolution"]
-        numChans = self.parent.getNumAllChannels()+2
-        self.data = ct.ARRAY(ct.c_long, numChans * self.numBins)(0)
+        # the number of channels is kept for getData
+        self._numChans = self.parent.getNumAllChannels()
+        numChans = self._numChans + 2
+        # each measurement gets a new zeroed buffer, because getData returns views of it
+        self.data = ct.ARRAY(ct.c_int32, numChans * self.numBins)()
         
-        self.bins = np.array(range(self.numBins), dtype='i8')
-        if (self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.bins = np.multiply(self.bins, self.parent.deviceConfig["Resolution"])
-        elif (self.parent.deviceConfig["MeasMode"] == MeasMode.T2.value):
-            self.bins = np.multiply(self.bins, self.T2binWidth)
-        elif (self.parent.deviceConfig["MeasMode"] == MeasMode.T3.value):
-            self.bins = np.multiply(self.bins, self.parent.deviceConfig["Resolution"])
+        # the bins are only rebuilt if the number of bins, the bin width or the measurement mode changed
+        measMode = self.parent.deviceConfig["MeasMode"]
+        binWidth = self.T2binWidth if measMode == MeasMode.T2.value else self.parent.deviceConfig["Resolution"]
+        binsKey = (self.numBins, binWidth, measMode)
+        if binsKey != self._binsKey:
+            self.bins = np.arange(self.numBins, dtype=np.int64)
+            if (measMode == MeasMode.Histogram.value):
+                self.bins = np.multiply(self.bins, self.parent.deviceConfig["Resolution"])
+            elif (measMode == MeasMode.T2.value):
+                self.bins = np.multiply(self.bins, self.T2binWidth)
+            elif (measMode == MeasMode.T3.value):
+                self.bins = np.multiply(self.bins, self.parent.deviceConfig["Resolution"])
+            # the bins are shared by all getData calls, so they are protected against changes by the caller
+            self.bins.flags.writeable = False
+            self._binsKey = binsKey
             
-        self.parent.dll.getHistogram.restype = ct.c_bool
-        return self.parent.dll.getHistogram(acqTime, waitFinished, savePTU, ct.byref(self.data), self.finished)
+        return self.parent.dll.getHistogram(acqTime, waitFinished, savePTU, ct.byref(self.data), ct.byref(self._finished))
     
 
     def getData(self):
@@ -4096,10 +5009,8 @@ Example
             break
     
         """
-        self.numBins = self.parent.deviceConfig["NumBins"]
-        numChans = self.parent.getNumAllChannels()
-        dataOut = np.lib.stride_tricks.as_strided(self.data, shape=(numChans, self.numBins),
-            strides=(ct.sizeof(self.data._type_) * self.numBins, ct.sizeof(self.data._type_)))
+        numChans = self._numChans
+        dataOut = np.frombuffer(self.data, dtype=self.data._type_, count=numChans * self.numBins).reshape(numChans, self.numBins)
         return dataOut, self.bins
     
 
@@ -4177,7 +5088,7 @@ Example
             break
     
         """
-        return self.finished.contents.value
+        return self._finished.value
 
 
 
@@ -4204,11 +5115,15 @@ Note
 
     def __init__(self, parent):
         self.parent = parent
-        self.data = ct.ARRAY(ct.c_long, 0)()
+        self.data = ct.ARRAY(ct.c_int32, 0)()
         self.t0 = ct.c_uint64(0)
         self.numBins = 10000
         self.historySize = 10
-        self.finished = ct.pointer(ct.c_bool(False))
+        self._numChans = 0
+        self._finished = ct.c_bool(False)
+        self.finished = ct.pointer(self._finished)
+        self._scale = self.numBins / self.historySize
+        self._timeAxis = np.arange(self.numBins, dtype=np.float64) * (self.historySize / self.numBins)
         
 
     def setNumBins(self, numBins: typing.Optional[int] = 10000):
@@ -4237,6 +5152,8 @@ Example
     
         """
         self.numBins = numBins
+        self._scale = self.numBins / self.historySize
+        self._timeAxis = np.arange(self.numBins, dtype=np.float64) * (self.historySize / self.numBins)
         self.parent.dll.setTimeTraceNumBins(numBins)
         
 
@@ -4274,7 +5191,8 @@ Example
     
         """
         self.historySize = historySize
-        self.parent.dll.setTimeTraceHistorySize.argtypes = [ct.c_double]
+        self._scale = self.numBins / self.historySize
+        self._timeAxis = np.arange(self.numBins, dtype=np.float64) * (self.historySize / self.numBins)
         self.parent.dll.setTimeTraceHistorySize(historySize)
         
 
@@ -4314,22 +5232,28 @@ Example
     sn.timeTrace.setHistorySize(10)
     
         """
-        numChans = self.parent.getNumAllChannels()
-        self.data = ct.ARRAY(ct.c_long, numChans * self.numBins)(0)
+        # the number of channels is kept for getData
+        self._numChans = self.parent.getNumAllChannels()
+        numChans = self._numChans
+        # each measurement gets a new zeroed buffer, because getData returns views of it
+        self.data = ct.ARRAY(ct.c_int32, numChans * self.numBins)()
         
         if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
             self.parent.logPrint( "measure is not supported for TimeTrace class in MeasMode:", 
                 MeasMode(self.parent.deviceConfig["MeasMode"]).name)
             return False
         
-        self.parent.dll.getTimeTrace.restype = ct.c_bool
-        return self.parent.dll.getTimeTrace(acqTime, waitFinished, savePTU, ct.byref(self.data), ct.byref(self.t0), self.finished)
+        return self.parent.dll.getTimeTrace(acqTime, waitFinished, savePTU, ct.byref(self.data), ct.byref(self.t0), ct.byref(self._finished))
     
 
     def getData(self, normalized: typing.Optional[bool] = True):
         """
 This function returns the data of the time trace measurement. The data is optimized for display in a chart and therefore held in a FIFO buffer.
 
+Note
+----
+    The returned data array is reused by the next call of this function. Copy it if you want to keep it.
+
 Parameters
 ----------
     normalized: bool (default: True)
@@ -4371,16 +5295,15 @@ Example
     
         """
         
-        numChans = self.parent.getNumAllChannels()
-        dataOut = np.lib.stride_tricks.as_strided(self.data, shape=(numChans, self.numBins),
-            strides=(ct.sizeof(self.data._type_) * self.numBins, ct.sizeof(self.data._type_)))
+        numChans = self._numChans
+        dataOut = np.frombuffer(self.data, dtype=self.data._type_, count=numChans * self.numBins).reshape(numChans, self.numBins)
         if normalized:
-            dataOut = np.multiply(dataOut, self.numBins/self.historySize)
+            # the scale is precomputed, the result is a new array so earlier results are kept
+            dataOut = np.multiply(dataOut, self._scale)
         
         t0 = (self.t0.value / self.numBins * self.historySize) - self.historySize
-        times = range(self.numBins)
-        times = np.multiply(times, self.historySize/self.numBins )
-        times = np.add(times, t0 )
+        # only the offset t0 is added to the precomputed time axis
+        times = self._timeAxis + t0
 
         return dataOut,times
     
@@ -4423,7 +5346,7 @@ Example
             break
     
         """
-        return self.finished.contents.value
+        return self._finished.value
 
 
     def stopMeasure(self):
@@ -4485,8 +5408,12 @@ multi-tau algorithm uses pseudo-logarithmically increasing bin widths.
 
     def __init__(self, parent):
         self.parent = parent
-        self.data = ct.ARRAY(ct.c_double, 0)()
-        self.bins = ct.ARRAY(ct.c_double, 0)()
+        self._dataNp = np.zeros(0, dtype=np.float64)
+        self._binsNp = np.zeros(0, dtype=np.float64)
+        self.data = (ct.c_double * 0).from_buffer(self._dataNp)
+        self.bins = (ct.c_double * 0).from_buffer(self._binsNp)
+        self._fcsData = np.zeros((2, 0), dtype=np.float64)
+        self._fcsBins = self._binsNp
         self.startChannel = 1
         self.stopChannel = 2
         self.numTaus = 1
@@ -4494,7 +5421,9 @@ multi-tau algorithm uses pseudo-logarithmically increasing bin widths.
         self.binWidth = 1000
         self.numBins = 0
         self.isFcs = False
-        self.finished = ct.pointer(ct.c_bool(False))
+        self._finished = ct.c_bool(False)
+        self._lastParams = None
+        self.finished = ct.pointer(self._finished)
         
 
     def setG2Parameters(self, startChannel: int, stopChannel: int, windowSize: float, binWidth: typing.Optional[float] = None):
@@ -4544,7 +5473,11 @@ Example
                 binWidth = self.parent.deviceConfig["BaseResolution"]
             elif self.parent.deviceConfig["MeasMode"] == MeasMode.T3.value:
                 binWidth = self.parent.deviceConfig["Resolution"]
-                
+        
+        # the API call is skipped if the same parameters are set again
+        params = ("G2", startChannel, stopChannel, windowSize, binWidth)
+        if params == self._lastParams:
+            return
         self.startChannel = startChannel
         self.stopChannel = stopChannel
         self.windowSize = windowSize
@@ -4552,8 +5485,8 @@ Example
         self.intervalLength = int(2 * windowSize / binWidth)
         self.isFcs = False
         
-        self.parent.dll.setG2Params.argtypes = [ct.c_int, ct.c_int, ct.c_double, ct.c_double]
         self.parent.dll.setG2Params(startChannel, stopChannel, windowSize, binWidth)
+        self._lastParams = params
     
 
     def setFCSParameters(self, startChannel: int, stopChannel: int, windowSize: typing.Optional[float] = 1e12, startTime: typing.Optional[float] = None, intervalLength: typing.Optional[int] = 8):
@@ -4611,6 +5544,9 @@ Example
             elif self.parent.deviceConfig["MeasMode"] == MeasMode.T3.value:
                 startTime = self.parent.deviceConfig["Resolution"]
         
+        params = ("FCS", startChannel, stopChannel, windowSize, startTime, intervalLength)
+        if params == self._lastParams:
+            return
         self.isFcs = True 
         self.startChannel = startChannel
         self.stopChannel = stopChannel
@@ -4618,11 +5554,11 @@ Example
         self.startTime = startTime
         self.intervalLength = intervalLength
 
-        pNumTaus = ct.pointer(ct.c_int(0))
+        pNumTaus = ct.pointer(ct.c_uint64(0))
         
-        self.parent.dll.setFCSParams.argtypes = [ct.c_int, ct.c_int, ct.POINTER(ct.c_int), ct.c_int, ct.c_double, ct.c_double]
         self.parent.dll.setFCSParams(startChannel, stopChannel, pNumTaus, intervalLength, windowSize, startTime)
         self.numTaus = pNumTaus.contents.value
+        self._lastParams = params
 
     def setFFCSParameters(self, startChannel: int, stopChannel: int, windowSize: typing.Optional[float] = 1e12, startTime: typing.Optional[float] = None, intervalLength: typing.Optional[int] = 8):
         """
@@ -4680,6 +5616,9 @@ Example
             elif self.parent.deviceConfig["MeasMode"] == MeasMode.T3.value:
                 startTime = self.parent.deviceConfig["Resolution"]
         
+        params = ("FFCS", startChannel, stopChannel, windowSize, startTime, intervalLength)
+        if params == self._lastParams:
+            return
         self.isFcs = True 
         self.startChannel = startChannel
         self.stopChannel = stopChannel
@@ -4687,11 +5626,11 @@ Example
         self.startTime = startTime
         self.intervalLength = intervalLength
 
-        pNumTaus = ct.pointer(ct.c_int(0))
+        pNumTaus = ct.pointer(ct.c_uint64(0))
         
-        self.parent.dll.setFFCSParams.argtypes = [ct.c_int, ct.c_int, ct.POINTER(ct.c_int), ct.c_int, ct.c_double, ct.c_double]
         self.parent.dll.setFFCSParams(startChannel, stopChannel, pNumTaus, intervalLength, windowSize, startTime)
         self.numTaus = pNumTaus.contents.value
+        self._lastParams = params
 
     def measure(self, acqTime: typing.Optional[int] = 1000, waitFinished: typing.Optional[bool] = False, savePTU: typing.Optional[bool] = False):
         """
@@ -4737,21 +5676,30 @@ Example
         break
         
         """
+        # the measurement mode is checked before any buffer is allocated
+        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
+            self.parent.logPrint( "measurement is not supported for Correlation class in MeasMode:", MeasMode.Histogram.name)
+            return False
         
         if self.isFcs:
             self.numBins = self.numTaus
-            self.data = ct.ARRAY(ct.c_double, 2 * self.numBins)(0)
+            dataSize = 2 * self.numBins
         else:
             self.numBins = self.intervalLength
-            self.data = ct.ARRAY(ct.c_double, self.numBins)(0)
-            
-        self.bins = ct.ARRAY(ct.c_double, self.numBins)(0) 
-        if(self.parent.deviceConfig["MeasMode"] == MeasMode.Histogram.value):
-            self.parent.logPrint( "measurement is not supported for Correlation class in MeasMode:", MeasMode(self.parent.deviceConfig["MeasMode"]).name)
-            return False
+            dataSize = self.numBins
         
-        self.parent.dll.getCorrelation.restype = ct.c_bool
-        return self.parent.dll.getCorrelation(acqTime, waitFinished, savePTU, ct.byref(self.data), ct.byref(self.bins), self.finished)
+        # the buffers are shared with the ctypes arrays passed to the API
+        # each measurement gets new buffers, because getG2Data and getFCSData return views of them
+        self._dataNp = np.zeros(dataSize, dtype=np.float64)
+        self._binsNp = np.zeros(self.numBins, dtype=np.float64)
+        self.data = (ct.c_double * dataSize).from_buffer(self._dataNp)
+        self.bins = (ct.c_double * self.numBins).from_buffer(self._binsNp)
+        if self.isFcs:
+            # the FCS views are created once per measurement and handed out by getFCSData
+            self._fcsData = self._dataNp.reshape(2, self.numBins)[:, 4:]
+            self._fcsBins = self._binsNp[4:]
+        
+        return self.parent.dll.getCorrelation(acqTime, waitFinished, savePTU, ct.byref(self.data), ct.byref(self.bins), ct.byref(self._finished))
 
 
     def getG2Data(self):
@@ -4799,7 +5747,7 @@ Example
     plt.show(block=True)
     
         """
-        return np.lib.stride_tricks.as_strided(self.data), np.lib.stride_tricks.as_strided(self.bins)
+        return self._dataNp, self._binsNp
 
 
     def getFCSData(self):
@@ -4851,8 +5799,128 @@ Example
     plt.show(block=True)    
     
         """
-        return np.lib.stride_tricks.as_strided(self.data, shape=(2, self.numBins),
-            strides=(ct.sizeof(self.data._type_) * self.numBins, ct.sizeof(self.data._type_)))[:, 4:], np.lib.stride_tricks.as_strided(self.bins)[4:]
+        return self._fcsData, self._fcsBins
+
+
+    def calcG2Data(self, times: np.ndarray, channels: np.ndarray):
+        """
+This function calculates the g(2) correlation of already measured T2 `Unfold` data in the python process,
+with the parameters of :meth:`setG2Parameters`. It can be used for reprocessing data, e.g. of a
+file device, with other channel combinations without a new measurement.
+
+Note
+----
+    The result is normalized like the g(2) correlation of :meth:`measure` :eq:`g2factor`.
+    For an autocorrelation the correlation of each event with itself is removed.
+
+Warning
+-------
+    Use this function with T2 `Unfold` timetags [ps] only.
+
+Parameters
+----------
+    times: NDArray[uint64]
+        T2 `Unfold` timetags
+    channels: NDArray[uint8]
+        `Unfold` channels
+
+Returns
+-------
+    tuple [1DArray, 1DArray]
+        data: 1DArray[float]
+            data array of the normalized g(2) correlation
+        bins: 1DArray[float]
+            data array of the start times of bins [s]
+
+Example
+-------
+::
+
+    # measures T2 data and correlates channel 1 with 2 afterwards
+    sn.unfold.measure(1000)
+    times, channels = sn.unfold.getData()
+    sn.correlation.setG2Parameters(1, 2, 1000, 10)
+    data, bins = sn.correlation.calcG2Data(times, channels)
+    
+        """
+        if self.isFcs:
+            self.parent.logPrint("calcG2Data needs the g(2) parameters, call setG2Parameters first")
+            return np.zeros(0, dtype=np.float64), np.zeros(0, dtype=np.float64)
+        
+        times = np.asarray(times)
+        channels = np.asarray(channels)
+        tagsA = times[channels == self.startChannel]
+        tagsB = tagsA if self.stopChannel == self.startChannel else times[channels == self.stopChannel]
+        counts = _tttr_kernels.correlate_g2(tagsA, tagsB, self.windowSize, self.binWidth)
+        if self.stopChannel == self.startChannel and len(counts):
+            counts[int(self.windowSize / self.binWidth)] -= len(tagsA)
+        
+        bins = (np.arange(len(counts), dtype=np.float64) * self.binWidth - self.windowSize) * 1e-12
+        if len(tagsA) == 0 or len(tagsB) == 0:
+            return np.zeros(len(counts), dtype=np.float64), bins
+        # the normalization factor is calculated once and applied with a single multiplication
+        scale = (float(times[-1]) - float(times[0])) / (self.binWidth * len(tagsA) * len(tagsB))
+        data = np.multiply(counts, scale, dtype=np.float64)
+        return data, bins
+
+
+    def calcFCSData(self, times: np.ndarray, channels: np.ndarray):
+        """
+This function calculates the FCS correlation of already measured T2 `Unfold` data in the python process,
+with the parameters of :meth:`setFCSParameters`. The multiple tau algorithm :eq:`multiTau` rebins both
+channels once per octave, so the lag times up to the window size are calculated in :math:`O(N \\log \\tau_{max})`.
+
+Note
+----
+    The result of each lag time is normalized with its bin width like :eq:`g2factor`.
+
+Warning
+-------
+    Use this function with T2 `Unfold` timetags [ps] only.
+
+Parameters
+----------
+    times: NDArray[uint64]
+        T2 `Unfold` timetags
+    channels: NDArray[uint8]
+        `Unfold` channels
+
+Returns
+-------
+    tuple [2DArray, 1DArray]
+        data: 2DArray[float]
+            data arrays of the normalized AB and BA correlation
+        bins: 1DArray[float]
+            data array of the lag times [s]
+
+Example
+-------
+::
+
+    # measures T2 data and calculates the FCS of channel 1 and 2 afterwards
+    sn.unfold.measure(10000)
+    times, channels = sn.unfold.getData()
+    sn.correlation.setFCSParameters(1, 2, 1e10, 1e5, 8)
+    data, bins = sn.correlation.calcFCSData(times, channels)
+    
+        """
+        if not self.isFcs:
+            self.parent.logPrint("calcFCSData needs the FCS parameters, call setFCSParameters first")
+            return np.zeros((2, 0), dtype=np.float64), np.zeros(0, dtype=np.float64)
+        
+        times = np.asarray(times)
+        channels = np.asarray(channels)
+        tagsA = times[channels == self.startChannel]
+        tagsB = times[channels == self.stopChannel]
+        taus, widths, productsAB, productsBA = _tttr_kernels.correlate_multitau(tagsA, tagsB, self.startTime, self.intervalLength, self.windowSize)
+        
+        data = np.zeros((2, len(taus)), dtype=np.float64)
+        if len(tagsA) and len(tagsB):
+            # one reciprocal per bin width, both curves are then multiplied in place
+            scale = (float(times[-1]) - float(times[0])) / (len(tagsA) * len(tagsB)) / widths
+            np.multiply(productsAB, scale, out=data[0])
+            np.multiply(productsBA, scale, out=data[1])
+        return data, taus * 1e-12
 
 
     def stopMeasure(self):
@@ -4929,7 +5997,7 @@ Example
             break
     
         """
-        return self.finished.contents.value
+        return self._finished.value
 
 
 
@@ -5016,6 +6084,7 @@ Example
     def __init__(self, parent):
         self.parent = parent
         self.config = []
+        self._confBuffer = (ct.c_char * 65535)()
 
     def getConfig(self):
         """
@@ -5046,9 +6115,12 @@ Example
     sn.manipulator.getConfig()
     
         """
-        conf = (ct.c_char * 65535)()
-        ok = self.parent.dll.getManisConfig(conf)
-        conf = str(conf, "utf-8").replace('\x00','')
+        # the buffer is reused and only the string up to the terminating zero is decoded
+        self._confBuffer[0] = b'\x00'
+        ok = self.parent.dll.getManisConfig(self._confBuffer)
+        # the manipulators add channels, so the number of all channels has to be read again
+        self.parent._numAllChannels = None
+        conf = self._confBuffer.value.decode("utf-8")
         if ok:
             self.config = json.loads(conf)
             return True
@@ -5142,12 +6214,10 @@ Example
     
         """
 
-        length = len(chans)
-        channels = (ct.c_int * length)()
-        for i in range(length):
-            channels[i] = chans[i]
-        self.parent.dll.addMCoincidence.argtypes = [ct.c_void_p, ct.c_int, ct.c_double, ct.c_int, ct.c_int, ct.c_bool]
-        chanOut = self.parent.dll.addMCoincidence(ct.pointer(channels), length, windowTime, mode.value, time.value, keepChannels)
+        # the channel array is referenced until the API call returns
+        channels = np.ascontiguousarray(chans, dtype=np.int32)
+        length = channels.size
+        chanOut = self.parent.dll.addMCoincidence(channels.ctypes.data_as(ct.POINTER(ct.c_int)), length, windowTime, mode.value, time.value, keepChannels)
         self.getConfig()
         return chanOut
     
@@ -5196,11 +6266,9 @@ Example
     
         """
 
-        length = len(chans)
-        channels = (ct.c_int * length)()
-        for i in range(length):
-            channels[i] = chans[i]
-        chanOut = self.parent.dll.addMMerge(ct.pointer(channels), length, keepChannels)
+        channels = np.ascontiguousarray(chans, dtype=np.int32)
+        length = channels.size
+        chanOut = self.parent.dll.addMMerge(channels.ctypes.data_as(ct.POINTER(ct.c_int)), length, keepChannels)
         self.getConfig()
         return chanOut
     
@@ -5278,7 +6346,6 @@ Example
     
         """
 
-        self.parent.dll.addMDelay.argtypes = [ct.c_int, ct.c_double, ct.c_bool]
         chanOut = self.parent.dll.addMDelay(channel, delayTime, keepSourceChannel)
         self.getConfig()
         return chanOut
@@ -5370,11 +6437,8 @@ Example
     
         """
 
-        length = len(gateChans)
-        channels = (ct.c_int * length)()
-        for i in range(length):
-            channels[i] = gateChans[i]
-        hChan = self.parent.dll.addMHerald(herald, ct.pointer(channels), len(channels), delayTime, gateTime, inverted, keepChannels)
+        channels = np.ascontiguousarray(gateChans, dtype=np.int32)
+        hChan = self.parent.dll.addMHerald(herald, channels.ctypes.data_as(ct.POINTER(ct.c_int)), len(channels), delayTime, gateTime, inverted, keepChannels)
         self.getConfig()
         return list(range(hChan, hChan + len(channels))) if keepChannels else gateChans
 
@@ -5436,7 +6500,6 @@ Example
 
         """
 
-        self.parent.dll.addMCountRate.argtypes = [ct.c_double]
         index = self.parent.dll.addMCountRate(windowTime)
         self.getConfig()
         return index
@@ -5471,4 +6534,46 @@ Example
         # dataOut = np.lib.stride_tricks.as_strided(countRates, shape=(numChans),
         #     strides=(ct.sizeof(countRates._type_) * numChans))
         self.getConfig()
-        return np.lib.stride_tricks.as_strided(countRates)
\ No newline at end of file
+        return np.lib.stride_tricks.as_strided(countRates)
+
+
+    def calcCoincidences(self, times: np.ndarray, channels: np.ndarray, chans: typing.List[int], windowTime: typing.Optional[float] = 1000):
+        """
+This function searches coincidences in already measured T2 `Unfold` data in the python process. It is an offline
+counterpart of :meth:`coincidence` with :obj:`.CoincidenceMode.CountAll` and :obj:`.CoincidenceTime.Last`:
+every event of the `chans` that has events of all other `chans` within the preceding `windowTime` is a coincidence.
+
+Note
+----
+    The presence of the channels in the window is packed into a bit mask per event, so the coincidences are
+    found with bit operations instead of branches.
+
+Parameters
+----------
+    times: NDArray[uint64]
+        T2 `Unfold` timetags [ps]
+    channels: NDArray[uint8]
+        `Unfold` channels
+    chans: List[int]
+        the channels that have to be coincident (max. 64)
+    windowTime: float [ps]
+        size of the coincidence window
+
+Returns
+-------
+    NDArray[uint64]:
+        the timetags of the coincidences
+
+Example
+-------
+::
+
+    # finds the coincidences of channel 1 and 2 within 1ns in measured data
+    sn.unfold.measure(1000)
+    times, channels = sn.unfold.getData()
+    cTimes = sn.manipulators.calcCoincidences(times, channels, [1,2], 1000)
+    sn.logPrint(f"{len(cTimes)} coincidences")
+    
+        """
+        times = np.asarray(times)
+        return times[_tttr_kernels.coincidence_mask(times, channels, chans, windowTime)]
@@ -0,0 +1,174 @@
+# Torsten Krause, PicoQuant GmbH, 2023
+
+import numpy as np
+
+# kernels to process TTTR records in the python process
+# the T2 and T3 records are unfolded into the same layout as the `Unfold` data of the snAPI.dll:
+# times: uint64 (T2: timetag, T3: nSync << 15 | dTime), channels: uint8 (0: sync, 1..N: channels, 0x80 | markers)
+
+T2_WRAPAROUND = 33554432
+T3_WRAPAROUND = 1024
+
+
+def _unfoldChannels(special, chan):
+    return np.where(special, np.where(chan == 0, 0, 0x80 | chan), chan + 1).astype(np.uint8)
+
+
+def _overflowPrefixSum(overflow, count, wrapAround):
+    # the overflow records hold the number of overflows (0 means 1 for older firmware)
+    ofl = np.where(overflow, np.maximum(count, 1), 0).astype(np.uint64)
+    return np.cumsum(ofl, dtype=np.uint64) * np.uint64(wrapAround)
+
+
+def unfold_T2(data):
+    """unfolds T2 records into 64 bit timetags and channels, the overflow records are removed"""
+    data = np.ascontiguousarray(data, dtype=np.uint32)
+    special = (data & 0x80000000) != 0
+    chan = ((data >> 25) & 0x3F).astype(np.uint8)
+    timeTag = (data & 0x01FFFFFF).astype(np.uint64)
+    overflow = special & (chan == 0x3F)
+    times = _overflowPrefixSum(overflow, timeTag, T2_WRAPAROUND) + timeTag
+    keep = ~overflow
+    return times[keep], _unfoldChannels(special[keep], chan[keep])
+
+
+def unfold_T3(data):
+    """unfolds T3 records into 64 bit timetags (nSync << 15 | dTime) and channels, the overflow records are removed"""
+    data = np.ascontiguousarray(data, dtype=np.uint32)
+    special = (data & 0x80000000) != 0
+    chan = ((data >> 25) & 0x3F).astype(np.uint8)
+    nSync = (data & 0x000003FF).astype(np.uint64)
+    dTime = ((data >> 10) & 0x00007FFF).astype(np.uint64)
+    overflow = special & (chan == 0x3F)
+    nSync += _overflowPrefixSum(overflow, nSync, T3_WRAPAROUND)
+    times = (nSync << np.uint64(15)) | dTime
+    keep = ~overflow
+    return times[keep], _unfoldChannels(special[keep], chan[keep])
+
+
+def split_T2(data):
+    """splits T2 records into 64 bit timetags, channels and the marker flags"""
+    times, channels = unfold_T2(data)
+    return times, channels, (channels & 0x80) != 0
+
+
+def split_T3(data):
+    """splits T3 records into 64 bit timetags (nSync << 15 | dTime), channels and the marker flags"""
+    times, channels = unfold_T3(data)
+    return times, channels, (channels & 0x80) != 0
+
+
+def _checkOut(out):
+    if out is not None and (not isinstance(out, np.ndarray) or out.dtype != np.uint64):
+        raise ValueError("the out buffer has to be a uint64 array")
+
+
+def nsync_T3(times, out=None):
+    """returns the sync periods of T3 timetags (nSync << 15 | dTime), any integer array is accepted"""
+    _checkOut(out)
+    return np.right_shift(np.asarray(times, dtype=np.uint64), np.uint64(15), out=out)
+
+
+def dtime_T3(times, out=None):
+    """returns the differential time slots of T3 timetags (nSync << 15 | dTime), any integer array is accepted"""
+    _checkOut(out)
+    return np.bitwise_and(np.asarray(times, dtype=np.uint64), np.uint64(0x7FFF), out=out)
+
+
+def correlate_g2(tagsA, tagsB, windowSize, binWidth, chunkSize=65536):
+    """histograms the time differences tagsB - tagsA within +-windowSize into bins of binWidth (two sorted timetag arrays)"""
+    numBins = int(2 * windowSize / binWidth)
+    counts = np.zeros(numBins, dtype=np.int64)
+    tagsA = np.ascontiguousarray(tagsA, dtype=np.int64)
+    tagsB = np.ascontiguousarray(tagsB, dtype=np.int64)
+    # the start events are processed in chunks to bound the memory of the pair arrays
+    for start in range(0, len(tagsA), chunkSize):
+        a = tagsA[start:start + chunkSize]
+        # the window is [-windowSize, windowSize), like the bins of the histogram
+        lo = np.searchsorted(tagsB, a - windowSize, side="left")
+        hi = np.searchsorted(tagsB, a + windowSize, side="left")
+        numPairs = hi - lo
+        total = int(numPairs.sum())
+        if total == 0:
+            continue
+        # indices of all stop events in the window of each start event
+        offsets = np.cumsum(numPairs) - numPairs
+        idxB = np.arange(total, dtype=np.int64) - np.repeat(offsets - lo, numPairs)
+        diff = tagsB[idxB] - np.repeat(a, numPairs)
+        # the bins have equal widths, so the bin index is calculated directly (no search in the bin borders)
+        # true division keeps the differences on a bin border in the upper bin
+        binIdx = ((diff + windowSize) / binWidth).astype(np.int64)
+        binIdx = binIdx[(binIdx >= 0) & (binIdx < numBins)]
+        counts += np.bincount(binIdx, minlength=numBins)[:numBins]
+    return counts
+
+
+def _mergeBins(idx, weights):
+    # sums the weights of equal (sorted) bin indices
+    if len(idx) == 0:
+        return idx, weights
+    starts = np.flatnonzero(np.concatenate(([True], idx[1:] != idx[:-1])))
+    return idx[starts], np.add.reduceat(weights, starts)
+
+
+def _lagProduct(idxA, wA, idxB, wB, lag):
+    # sum of wA[i] * wB[j] for all idxB[j] == idxA[i] + lag
+    target = idxA + lag
+    pos = np.searchsorted(idxB, target)
+    valid = pos < len(idxB)
+    pos = pos[valid]
+    match = idxB[pos] == target[valid]
+    return int(np.dot(wA[valid][match], wB[pos[match]]))
+
+
+def correlate_multitau(tagsA, tagsB, tau0, intervalLength, maxTau):
+    """multi-tau correlation of two sorted timetag arrays, the bin width doubles every octave
+    returns the lag times, the bin widths and the unnormalized products of A->B and B->A"""
+    if intervalLength < 1:
+        raise ValueError(f"the interval length has to be at least 1, got {intervalLength}")
+    if tau0 <= 0:
+        raise ValueError(f"the minimum tau has to be positive, got {tau0}")
+    idxA, wA = _mergeBins(np.floor(np.asarray(tagsA, dtype=np.float64) / tau0).astype(np.int64), np.ones(len(tagsA), dtype=np.int64))
+    idxB, wB = _mergeBins(np.floor(np.asarray(tagsB, dtype=np.float64) / tau0).astype(np.int64), np.ones(len(tagsB), dtype=np.int64))
+    taus, widths, productsAB, productsBA = [], [], [], []
+    width = tau0
+    lags = range(1, intervalLength + 1)
+    while True:
+        for lag in lags:
+            if lag * width > maxTau:
+                return (np.array(taus, dtype=np.float64), np.array(widths, dtype=np.float64),
+                    np.array(productsAB, dtype=np.int64), np.array(productsBA, dtype=np.int64))
+            taus.append(lag * width)
+            widths.append(width)
+            productsAB.append(_lagProduct(idxA, wA, idxB, wB, lag))
+            productsBA.append(_lagProduct(idxB, wB, idxA, wA, lag))
+        # rebinning once per octave, the following octaves use the upper half of the lags
+        idxA, wA = _mergeBins(idxA >> 1, wA)
+        idxB, wB = _mergeBins(idxB >> 1, wB)
+        width *= 2
+        lags = range(intervalLength // 2 + 1, intervalLength + 1)
+
+
+def coincidence_mask(times, channels, chans, windowTime):
+    """returns a boolean array that is True for each event of chans that completes a coincidence, i.e. all chans
+    had an event within the preceding windowTime (including the event itself)"""
+    times = np.asarray(times)
+    channels = np.asarray(channels)
+    chans = np.unique(np.asarray(chans, dtype=np.uint8))
+    isCandidate = np.isin(channels, chans)
+    candTimes = times[isCandidate].astype(np.int64)
+    # the presence of each channel in the window is packed into one bit of a mask per event
+    required = np.uint64(0)
+    mask = np.zeros(len(candTimes), dtype=np.uint64)
+    for bit, chan in enumerate(chans):
+        required |= np.uint64(1) << np.uint64(bit)
+        chanTimes = times[channels == chan].astype(np.int64)
+        if len(chanTimes) == 0:
+            # a channel without events is never present, so no coincidence can be completed
+            continue
+        last = np.searchsorted(chanTimes, candTimes, side="right") - 1
+        present = (last >= 0) & (candTimes - chanTimes[np.maximum(last, 0)] <= windowTime)
+        mask |= present.astype(np.uint64) << np.uint64(bit)
+    result = np.zeros(len(times), dtype=bool)
+    result[isCandidate] = (mask & required) == required
+    return result
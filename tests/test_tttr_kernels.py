@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from snAPI import _tttr_kernels
+
+
+def test_coincidence_mask_empty_channel():
+    # channel 3 has no events in the block, so no coincidence can be found
+    times = np.array([100, 105, 200, 204], dtype=np.uint64)
+    channels = np.array([1, 2, 1, 2], dtype=np.uint8)
+    mask = _tttr_kernels.coincidence_mask(times, channels, [1, 2, 3], 10)
+    assert mask.dtype == bool
+    assert not mask.any()
+    assert len(mask) == len(times)
+
+
+def test_coincidence_mask_two_channels():
+    times = np.array([100, 105, 200, 300], dtype=np.uint64)
+    channels = np.array([1, 2, 1, 2], dtype=np.uint8)
+    mask = _tttr_kernels.coincidence_mask(times, channels, [1, 2], 10)
+    assert mask.tolist() == [False, True, False, False]
+
+
+def test_T3_fields_int64_input():
+    # a timetag array built by the user has the default int64 dtype
+    times = np.array([(5 << 15) | 7, (1 << 15) | 0x7FFF])
+    assert times.dtype == np.int64
+    assert _tttr_kernels.nsync_T3(times).tolist() == [5, 1]
+    assert _tttr_kernels.dtime_T3(times).tolist() == [7, 0x7FFF]
+    out = np.empty(2, dtype=np.uint64)
+    assert _tttr_kernels.nsync_T3(times, out=out) is out
+    assert out.tolist() == [5, 1]
+
+
+def test_T3_fields_out_dtype():
+    times = np.array([(5 << 15) | 7], dtype=np.uint64)
+    with pytest.raises(ValueError):
+        _tttr_kernels.dtime_T3(times, out=np.empty(1, dtype=np.int64))
+
+
+def test_correlate_g2_window_borders():
+    # -windowSize is in the first bin, +windowSize is outside of the window
+    counts = _tttr_kernels.correlate_g2([100], [90, 100, 110], 10, 5)
+    assert counts.tolist() == [1, 0, 1, 0]
+
+
+@pytest.mark.parametrize("tau0, intervalLength", [(1, 0), (0, 8)])
+def test_correlate_multitau_invalid_parameters(tau0, intervalLength):
+    with pytest.raises(ValueError):
+        _tttr_kernels.correlate_multitau([1, 2, 3], [2, 3, 4], tau0, intervalLength, 100)